@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Adaptive quiz mode
+Estimates an ability per skill from the answers so far (a Rasch/Elo-style
+update) and picks the next question whose difficulty is the most informative
+for the least certain skill. Selection runs against per-skill, per-difficulty
+buckets that are built once per question bank.
+"""
+
+import math
+import os
+
+# Difficulty labels on the ability scale; unknown labels sit in the middle
+DIFFICULTY_LEVELS = {"Basic": -1.0, "Intermediate": 0.0, "Advanced": 1.0}
+
+ADAPTIVE_MAX_QUESTIONS = int(os.environ.get("ADAPTIVE_MAX_QUESTIONS", "8"))
+# A skill counts as measured once its standard error drops below this. One answer
+# adds at most 0.25 information, so 1.2 takes about three well-targeted answers
+# per skill, which keeps a two-skill session under ADAPTIVE_MAX_QUESTIONS
+ADAPTIVE_TARGET_SE = float(os.environ.get("ADAPTIVE_TARGET_SE", "1.2"))
+# Step size of the ability update; smaller steps keep the next question near the
+# examinee's level, where each answer is most informative
+ADAPTIVE_K = float(os.environ.get("ADAPTIVE_K", "0.7"))
+
+
+class AdaptiveIndex:
+    """Per-skill difficulty buckets of question positions, sorted by difficulty"""
+
+    def __init__(self, bank):
+        self.bank = bank
+        self.levels = [DIFFICULTY_LEVELS.get(name, 0.0) for name in bank.difficulties]
+        buckets = {}
+        for position, (skill, difficulty) in enumerate(zip(bank.skill_codes, bank.difficulty_codes)):
+            buckets.setdefault(skill, {}).setdefault(difficulty, []).append(position)
+        # skill code -> [(level, positions), ...] in order of difficulty
+        self.buckets = {
+            skill: sorted(((self.levels[d], positions) for d, positions in by_difficulty.items()),
+                          key=lambda bucket: bucket[0])
+            for skill, by_difficulty in buckets.items()
+        }
+
+    @classmethod
+    def for_bank(cls, bank):
+        """Build once per bank; a reloaded bank gets a fresh index"""
+        index = getattr(bank, "_adaptive_index", None)
+        if index is None:
+            index = bank._adaptive_index = cls(bank)
+        return index
+
+    def estimate(self, answers):
+        """Replay (question_id, selected_answer) pairs into per-skill ability estimates
+
+        Returns (skill code -> [ability, information, answered], answered positions).
+        """
+        bank = self.bank
+        state = {}
+        seen = set()
+        for question_id, selected_answer in answers:
+            position = bank.index_by_id.get(question_id)
+            if position is None or position in seen:
+                continue
+            seen.add(position)
+
+            skill = bank.skill_codes[position]
+            level = self.levels[bank.difficulty_codes[position]]
+            ability, information, answered = state.setdefault(skill, [0.0, 0.0, 0])
+
+            expected = 1.0 / (1.0 + math.exp(level - ability))
+            outcome = 1.0 if selected_answer == bank.correct[position] else 0.0
+            # Big steps while little is known, smaller ones as answers accumulate
+            ability += ADAPTIVE_K / (1 + 0.5 * answered) * (outcome - expected)
+            state[skill] = [ability, information + expected * (1.0 - expected), answered + 1]
+        return state, seen
+
+    def next_question(self, answers, max_questions=ADAPTIVE_MAX_QUESTIONS):
+        """Return (position or None, estimates); None means the session is done"""
+        state, seen = self.estimate(answers)
+
+        def standard_error(skill):
+            information = state[skill][1] if skill in state else 0.0
+            return 1.0 / math.sqrt(information) if information else math.inf
+
+        next_position = None
+        if len(seen) < max_questions:
+            # Least certain skill first; ties go to the skill answered least
+            candidates = sorted(
+                (skill for skill in self.buckets if standard_error(skill) > ADAPTIVE_TARGET_SE),
+                key=lambda skill: (-standard_error(skill), state.get(skill, (0, 0, 0))[2], skill)
+            )
+            for skill in candidates:
+                ability = state[skill][0] if skill in state else 0.0
+                # The most informative question is the one closest to the current ability
+                for _, positions in sorted(self.buckets[skill], key=lambda bucket: abs(bucket[0] - ability)):
+                    next_position = next((p for p in positions if p not in seen), None)
+                    if next_position is not None:
+                        break
+                if next_position is not None:
+                    break
+
+        abilities = {
+            self.bank.skills[skill]: {
+                "ability": round(ability, 3),
+                "standard_error": round(standard_error(skill), 3),
+                "answered": answered,
+            }
+            for skill, (ability, _, answered) in state.items()
+        }
+        return next_position, {"answered": len(seen), "abilities": abilities}
+
+
+def next_question(bank, answers, language, max_questions=ADAPTIVE_MAX_QUESTIONS):
+    """API response for the adaptive quiz: the next localized question, or done"""
+    position, estimates = AdaptiveIndex.for_bank(bank).next_question(answers, max_questions)
+    return {
+        "done": position is None,
+        "question": None if position is None else bank.localized[language][position],
+        **estimates,
+        "max_questions": max_questions,
+    }
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Running aggregates over stored quiz results
+Every write to quiz results goes through QuizAnalytics.save, which adds the
+result's counters (minus those of the result it replaces) in the same storage
+transaction. The counters live next to the results, so every worker sees the
+same totals and /analytics reads a small table instead of scanning storage.
+Each user contributes their latest result only, matching what storage keeps.
+"""
+
+import time
+
+# Percentage histogram buckets: 0-9, 10-19, ..., 90-100
+HISTOGRAM_BUCKETS = 10
+
+
+def _rate(correct, total):
+    return round((correct / total) * 100, 1) if total else 0.0
+
+
+def result_counters(result, bank, sign=1):
+    """{counter name: value} one stored result adds (sign=1) or removes (sign=-1)"""
+    percentage = result.get("percentage", 0)
+    counters = {
+        "submissions": sign,
+        "score_sum": sign * result.get("score", 0),
+        "percentage_sum": sign * percentage,
+        "time_sum": sign * result.get("time_taken", 0.0),
+        f"histogram:{min(int(percentage) // 10, HISTOGRAM_BUCKETS - 1)}": sign,
+    }
+
+    def add(name, value):
+        counters[name] = counters.get(name, 0) + value
+
+    for kind, analysis in (("skill", result.get("skill_analysis", {})),
+                           ("difficulty", result.get("difficulty_analysis", {}))):
+        for name, breakdown in analysis.items():
+            add(f"{kind}:{name}:correct", sign * breakdown["correct"])
+            add(f"{kind}:{name}:total", sign * breakdown["total"])
+
+    # Correctness as scored when the result was stored; results saved before
+    # is_correct was recorded fall back to the current bank
+    for answer in result.get("answers", []):
+        if "is_correct" in answer:
+            is_correct = answer["is_correct"]
+        else:
+            is_correct = bank.is_correct(answer["question_id"], answer["selected_answer"])
+        if is_correct is None:
+            continue
+        add(f"question:{answer['question_id']}:correct", sign * bool(is_correct))
+        add(f"question:{answer['question_id']}:total", sign)
+    return counters
+
+
+class QuizAnalytics:
+    """Population-level counters kept in storage and updated one result at a time"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    @staticmethod
+    def _delta(previous, result, bank):
+        delta = result_counters(result, bank)
+        if previous is not None:
+            for name, value in result_counters(previous, bank, -1).items():
+                delta[name] = delta.get(name, 0) + value
+        return delta
+
+    def save(self, user_id, result, bank):
+        """Store a result and account for the one it replaces (if any) atomically"""
+        self.storage.save_quiz_result(user_id, result, lambda previous: self._delta(previous, result, bank))
+
+    def save_many(self, items, bank):
+        """save() for (user_id, result) pairs in one transaction; later pairs replace earlier ones"""
+        self.storage.save_quiz_results_many(items, lambda previous, result: self._delta(previous, result, bank))
+
+    def rebuild(self, bank, if_missing=False):
+        """Recompute the counters from every stored result in one streaming pass"""
+        def compute(results):
+            totals = {}
+            for _, result in results:
+                for name, value in result_counters(result, bank).items():
+                    totals[name] = totals.get(name, 0) + value
+            totals.setdefault("submissions", 0)
+            totals["rebuilt_at"] = time.time()
+            return totals
+
+        started = time.time()
+        counters = self.storage.rebuild_counters(compute, if_missing)
+        if counters is not None:
+            print(f"📊 Analytics rebuilt from {counters['submissions']} quiz results ({time.time() - started:.2f}s)")
+        return counters
+
+    def snapshot(self, bank):
+        """Current aggregates; the counters are rebuilt on first use (e.g. after a bulk import)"""
+        counters = self.storage.get_counters()
+        if not counters:
+            counters = self.rebuild(bank, if_missing=True) or self.storage.get_counters()
+
+        submissions = int(counters.get("submissions", 0))
+        grouped = {"skill": {}, "difficulty": {}, "question": {}}
+        for name, value in counters.items():
+            kind, _, rest = name.partition(":")
+            if kind in grouped:
+                key, _, field = rest.rpartition(":")
+                grouped[kind].setdefault(key, {})[field] = int(value)
+
+        def accuracy(kind):
+            return {
+                name: {"correct": c.get("correct", 0), "total": c.get("total", 0),
+                       "accuracy": _rate(c.get("correct", 0), c.get("total", 0))}
+                for name, c in grouped[kind].items() if c.get("total")
+            }
+
+        return {
+            "submissions": submissions,
+            "mean_score": round(counters.get("score_sum", 0) / submissions, 2) if submissions else 0.0,
+            "mean_percentage": round(counters.get("percentage_sum", 0) / submissions, 1) if submissions else 0.0,
+            "mean_time_taken": round(counters.get("time_sum", 0) / submissions, 2) if submissions else 0.0,
+            "percentage_histogram": {
+                f"{i * 10}-{i * 10 + 9 if i < HISTOGRAM_BUCKETS - 1 else 100}": int(counters.get(f"histogram:{i}", 0))
+                for i in range(HISTOGRAM_BUCKETS)
+            },
+            "skill_accuracy": accuracy("skill"),
+            "difficulty_accuracy": accuracy("difficulty"),
+            "question_correct_rate": {
+                question_id: {"correct": c.get("correct", 0), "answered": c.get("total", 0),
+                              "correct_rate": _rate(c.get("correct", 0), c.get("total", 0))}
+                for question_id, c in sorted(grouped["question"].items(), key=lambda item: int(item[0]))
+                if c.get("total")
+            },
+            "rebuilt_at": counters.get("rebuilt_at"),
+        }
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Application factory for the Digital Skills Assessment API
+One app, three modes sharing the same question bank, scoring and storage code:
+
+    mock       scores answers but stores nothing; FAQ chat (frontend development)
+    quiz-only  profiles, scoring, results, analytics and history in storage;
+               FAQ chat; no LangChain/Ollama imports, so it is cheap to run
+               on many small workers
+    full-rag   quiz-only plus the RAG chat from my-rag-bot/ (warm-up, answer
+               cache, conversation memory, streaming)
+
+Run with APP_MODE set and uvicorn's factory flag:
+    APP_MODE=quiz-only uvicorn app_factory:create_app --factory --workers 8
+"""
+
+import json
+import os
+import sys
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from adaptive_quiz import ADAPTIVE_MAX_QUESTIONS, next_question
+from fallback import FallbackEngine
+from question_bank import QuestionBankFile
+from user_ids import new_user_id
+
+APP_MODE = os.environ.get("APP_MODE", "full-rag").lower()
+APP_MODES = ("mock", "quiz-only", "full-rag")
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAG_DIR = os.path.join(BASE_DIR, "my-rag-bot")
+
+
+# Data Models
+class UserProfile(BaseModel):
+    name: str
+    age: int
+    goal: str
+    experience: str
+
+class QuizAnswer(BaseModel):
+    question_id: int
+    selected_answer: int
+    time_taken: float = 0.0
+
+class QuizSubmission(BaseModel):
+    user_id: str
+    answers: List[QuizAnswer]
+    total_time: float
+
+class QuizBatchSubmission(BaseModel):
+    submissions: List[QuizSubmission]
+
+class AdaptiveQuizRequest(BaseModel):
+    answers: List[QuizAnswer] = []
+    language: str = "en"
+    max_questions: int = ADAPTIVE_MAX_QUESTIONS
+
+class ChatMessage(BaseModel):
+    message: str
+    user_id: str = "anonymous"
+
+
+class AppCore:
+    """State shared by every mode; storage and analytics are None in mock mode"""
+
+    def __init__(self, mode, persistent=True):
+        self.mode = mode
+        # Quiz questions are loaded from quiz_questions.json and reloaded when it changes
+        self.quiz_bank = QuestionBankFile()
+        # Curated chat answers from faq.json and the RAG bot's text files
+        self.fallback = FallbackEngine.load()
+        self.storage = None
+        self.analytics = None
+        if persistent:
+            from analytics import QuizAnalytics
+            from storage import create_storage
+
+            # Store user data (SQLite by default, see storage.py)
+            self.storage = create_storage()
+            # Population-level quiz stats, kept in storage and updated with every submission
+            self.analytics = QuizAnalytics(self.storage)
+        # Extra /health fields, added by the modes that have them
+        self.health = []
+
+    def record_chat(self, user_id, user_message, response):
+        """Append a completed exchange to the user's chat history"""
+        if self.storage is None:
+            return
+        self.storage.append_chat(user_id, {
+            "user_message": user_message,
+            "bot_response": response,
+            "timestamp": str(datetime.now())
+        })
+
+
+def create_app(mode=None):
+    """Build the API for mode (APP_MODE when not given)"""
+    mode = (mode or APP_MODE).lower()
+    if mode not in APP_MODES:
+        raise ValueError(f"Unknown APP_MODE {mode!r}, expected one of {APP_MODES}")
+
+    app = FastAPI(title="Digital Skills Assessment API", version="1.0.0")
+
+    # Add CORS middleware
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    core = AppCore(mode, persistent=mode != "mock")
+    app.state.core = core
+
+    add_quiz_routes(app, core)
+    if core.storage is not None:
+        add_storage_routes(app, core)
+    else:
+        add_mock_routes(app, core)
+
+    if mode == "full-rag":
+        # The RAG modules live next to the RAG bot
+        if RAG_DIR not in sys.path:
+            sys.path.insert(0, RAG_DIR)
+        from rag_api import add_rag_routes
+        add_rag_routes(app, core)
+    else:
+        add_faq_chat_routes(app, core)
+
+    @app.get("/health")
+    def health_check():
+        status = {"status": "healthy", "mode": core.mode}
+        for extra in core.health:
+            status.update(extra())
+        return status
+
+    return app
+
+
+def add_quiz_routes(app, core):
+    """Question bank endpoints, identical in every mode"""
+    quiz_bank = core.quiz_bank
+
+    @app.get("/")
+    def home():
+        return {"message": "Digital Skills Assessment API is running!", "version": "1.0.0"}
+
+    @app.get("/quiz/questions")
+    def get_quiz_questions(request: Request):
+        """Get all quiz questions"""
+        return quiz_bank.get().response(None, request.headers.get("if-none-match"))
+
+    @app.get("/quiz/questions/{language}")
+    def get_quiz_questions_by_language(language: str, request: Request):
+        """Get quiz questions in specific language"""
+        question_bank = quiz_bank.get()
+        if language not in question_bank.languages:
+            raise HTTPException(status_code=400, detail="Language not supported")
+
+        # Payloads are serialized once per bank version; unchanged banks answer 304
+        return question_bank.response(language, request.headers.get("if-none-match"))
+
+    @app.post("/quiz/next")
+    def get_next_quiz_question(request: AdaptiveQuizRequest):
+        """Adaptive mode: send the answers so far, get the most useful next question"""
+        question_bank = quiz_bank.get()
+        if request.language not in question_bank.languages:
+            raise HTTPException(status_code=400, detail="Language not supported")
+
+        # When "done" is true, submit the same answers to /quiz/submit for the full results
+        return next_question(
+            question_bank,
+            [(answer.question_id, answer.selected_answer) for answer in request.answers],
+            request.language,
+            request.max_questions
+        )
+
+    @app.post("/quiz/reload")
+    def reload_quiz_questions():
+        """Reload quiz_questions.json now instead of waiting for the file watcher"""
+        try:
+            quiz_bank.reload()
+        except (OSError, ValueError) as e:
+            raise HTTPException(status_code=400, detail=f"Question bank not reloaded: {e}")
+
+        return quiz_bank.status()
+
+
+def add_mock_routes(app, core):
+    """Profile and submit without storage: real scores, nothing remembered"""
+
+    @app.post("/profile")
+    def save_profile(profile: UserProfile):
+        user_id = new_user_id()
+        return {"message": "Profile saved successfully!", "user_id": user_id, "profile": profile.dict()}
+
+    @app.post("/quiz/submit")
+    def submit_quiz(submission: QuizSubmission):
+        """Score quiz answers (any user_id is accepted; nothing is stored)"""
+        results = core.quiz_bank.get().score(
+            (answer.question_id, answer.selected_answer) for answer in submission.answers
+        )
+        return {
+            "user_id": submission.user_id,
+            **results,
+            "time_taken": submission.total_time
+        }
+
+
+def stored_answers(question_bank, answers):
+    """Answers as stored with a result; is_correct is fixed at scoring time, so the
+    analytics stay consistent when the bank's correct answers are edited later"""
+    return [
+        {**answer.dict(), "is_correct": question_bank.is_correct(answer.question_id, answer.selected_answer)}
+        for answer in answers
+    ]
+
+
+def add_storage_routes(app, core):
+    """Profiles, scoring with stored results, analytics and chat history"""
+    from bulk_io import import_at_startup
+    from storage import CHAT_PAGE_MAX, CHAT_PAGE_SIZE, chat_cursor
+
+    quiz_bank, storage, analytics = core.quiz_bank, core.storage, core.analytics
+
+    @app.on_event("startup")
+    def import_profiles():
+        # Optional bulk load of STORAGE_IMPORT_PROFILES (e.g. user_profiles.json)
+        import_at_startup(storage)
+
+    @app.on_event("shutdown")
+    def close_storage():
+        storage.close()
+
+    @app.post("/profile")
+    def save_profile(profile: UserProfile):
+        user_id = new_user_id()
+        storage.save_profile(user_id, profile.dict())
+
+        return {"message": "Profile saved successfully!", "user_id": user_id, "profile": profile.dict()}
+
+    @app.post("/quiz/submit")
+    def submit_quiz(submission: QuizSubmission):
+        """Submit quiz answers and get results"""
+        if not storage.has_profile(submission.user_id):
+            raise HTTPException(status_code=404, detail="User profile not found")
+
+        # Calculate results from the compiled bank - no per-answer scans
+        question_bank = quiz_bank.get()
+        results = question_bank.score(
+            (answer.question_id, answer.selected_answer) for answer in submission.answers
+        )
+
+        # Store results (a retake replaces the user's previous result in the analytics too)
+        stored = {
+            **results,
+            "time_taken": submission.total_time,
+            "answers": stored_answers(question_bank, submission.answers)
+        }
+        analytics.save(submission.user_id, stored, question_bank)
+
+        return {
+            "user_id": submission.user_id,
+            **results,
+            "time_taken": submission.total_time
+        }
+
+    @app.post("/quiz/submit/batch")
+    def submit_quiz_batch(batch: QuizBatchSubmission):
+        """Submit a whole classroom's quizzes at once; each result matches /quiz/submit"""
+        # One profile lookup and one write for the whole batch
+        known_users = storage.existing_profiles(s.user_id for s in batch.submissions)
+        accepted = [s for s in batch.submissions if s.user_id in known_users]
+        errors = [
+            {"user_id": s.user_id, "detail": "User profile not found"}
+            for s in batch.submissions if s.user_id not in known_users
+        ]
+
+        question_bank = quiz_bank.get()
+        scored = question_bank.score_batch([
+            [(answer.question_id, answer.selected_answer) for answer in s.answers] for s in accepted
+        ]) if accepted else []
+
+        stored = [
+            (s.user_id, {**results, "time_taken": s.total_time, "answers": stored_answers(question_bank, s.answers)})
+            for s, results in zip(accepted, scored)
+        ]
+        # Later entries for the same user replace earlier ones, in storage and analytics
+        analytics.save_many(stored, question_bank)
+
+        return {
+            "results": [
+                {"user_id": s.user_id, **results, "time_taken": s.total_time}
+                for s, results in zip(accepted, scored)
+            ],
+            "errors": errors,
+            "total": len(batch.submissions)
+        }
+
+    @app.get("/analytics")
+    def get_analytics():
+        """Population-level quiz stats from running aggregates (no storage scan)"""
+        return analytics.snapshot(quiz_bank.get())
+
+    @app.post("/analytics/rebuild")
+    def rebuild_analytics_now():
+        """Recompute the aggregates from storage, e.g. after a bulk import"""
+        question_bank = quiz_bank.get()
+        analytics.rebuild(question_bank)
+        return analytics.snapshot(question_bank)
+
+    @app.get("/quiz/results/{user_id}")
+    def get_quiz_results(user_id: str):
+        """Get quiz results for a user"""
+        result = storage.get_quiz_result(user_id)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Quiz results not found")
+
+        return result
+
+    @app.get("/chat/history/{user_id}")
+    def get_chat_history(user_id: str, limit: int = CHAT_PAGE_SIZE, before: Optional[str] = None,
+                         after: Optional[str] = None):
+        """Get a page of chat history for a user, newest page first
+
+        Pass next_before back as ?before= to page further back, or next_after as
+        ?after= to fetch messages newer than the ones already shown.
+        """
+        if before is not None and after is not None:
+            raise HTTPException(status_code=400, detail="Use either before or after, not both")
+        limit = max(1, min(limit, CHAT_PAGE_MAX))
+
+        history, has_more = storage.get_chat_page(user_id, limit, before=before, after=after)
+        return {
+            "history": history,
+            "has_more": has_more,
+            "next_before": chat_cursor(history[0]) if history else before,
+            "next_after": chat_cursor(history[-1]) if history else after
+        }
+
+    @app.get("/chat/history/{user_id}/export")
+    def export_chat_history(user_id: str):
+        """Stream a user's full chat history as NDJSON, one message per line"""
+        def lines():
+            for entry in storage.iter_chat_history(user_id):
+                yield json.dumps(entry, ensure_ascii=False) + "\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/users/{user_id}/profile")
+    def get_user_profile(user_id: str):
+        """Get user profile"""
+        profile = storage.get_profile(user_id)
+        if profile is None:
+            raise HTTPException(status_code=404, detail="User profile not found")
+
+        return {"user_id": user_id, "profile": profile}
+
+
+def add_faq_chat_routes(app, core):
+    """Chat without an LLM: curated answers and knowledge-base passages"""
+    core.health.append(lambda: {"rag_bot": "not_available", "fallback": core.fallback.stats()})
+
+    def reply(message):
+        answer = core.fallback.answer(message.message)
+        core.record_chat(message.user_id, message.message, answer["response"])
+        return {
+            "response": answer["response"],
+            "source": answer["source"],
+            "user_id": message.user_id,
+            "timestamp": str(datetime.now())
+        }
+
+    @app.get("/ready")
+    def readiness_check():
+        """Nothing to warm up without the RAG bot"""
+        return {"stage": "ready", "ready": True, "error": None, "elapsed_seconds": 0.0}
+
+    @app.post("/chat")
+    def chat_with_bot(message: ChatMessage):
+        """Chat with the FAQ engine"""
+        return reply(message)
+
+    @app.post("/chat/stream")
+    def chat_stream(message: ChatMessage):
+        """Same NDJSON events as the RAG stream; the whole answer arrives as one token"""
+        result = reply(message)
+
+        def events():
+            yield json.dumps({"type": "token", "token": result["response"]}) + "\n"
+            yield json.dumps({"type": "done", **result}) + "\n"
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Streaming JSONL import/export for profiles, quiz results and chat history
+Records are processed in fixed-size batches, so memory use does not grow with file size
+
+Usage:
+    python bulk_io.py import profiles user_profiles.json
+    python bulk_io.py export quiz_results results.jsonl
+    python bulk_io.py export chat_history -          # write to stdout
+
+Record shapes (one JSON object per line):
+    profiles:      {"user_id": ..., "profile": {...}}
+    quiz_results:  {"user_id": ..., "result": {...}}
+    chat_history:  {"user_id": ..., "user_message": ..., "bot_response": ..., "timestamp": ...}
+
+Profiles and quiz results are upserted by user_id, so repeated ids in a file
+collapse to the last record. Set STORAGE_IMPORT_PROFILES=user_profiles.json to
+load a profile file when the backend starts; storage remembers the file's size
+and modification time, so only one worker imports it and restarts skip it
+until it changes.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+from storage import create_storage
+
+BULK_BATCH_SIZE = int(os.environ.get("BULK_BATCH_SIZE", "10000"))
+STORAGE_IMPORT_PROFILES = os.environ.get("STORAGE_IMPORT_PROFILES", "")
+# A startup import claimed longer ago than this (seconds) is taken to have died
+STORAGE_IMPORT_STALE = float(os.environ.get("STORAGE_IMPORT_STALE", "3600"))
+
+KINDS = ("profiles", "quiz_results", "chat_history")
+
+
+def _profile_record(record):
+    return record["user_id"], record["profile"]
+
+
+def _result_record(record):
+    return record["user_id"], record["result"]
+
+
+def _chat_record(record):
+    entry = {
+        "user_message": record["user_message"],
+        "bot_response": record["bot_response"],
+        "timestamp": record["timestamp"],
+    }
+    return record["user_id"], entry
+
+
+def read_jsonl(path, parse, stats):
+    """Yield parsed records from a JSONL file, skipping and counting bad lines"""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield parse(json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                stats["skipped"] += 1
+                print(f"⚠️  {path}:{line_number}: skipped ({e})", file=sys.stderr)
+
+
+def import_jsonl(storage, kind, path, batch_size=BULK_BATCH_SIZE):
+    """Stream a JSONL file into storage; returns {"records", "skipped", "seconds", "rate"}"""
+    parse, write = {
+        "profiles": (_profile_record, storage.save_profiles_many),
+        "quiz_results": (_result_record, storage.save_quiz_results_many),
+        "chat_history": (_chat_record, storage.append_chat_many),
+    }[kind]
+
+    stats = {"records": 0, "skipped": 0}
+    started = time.time()
+    records = read_jsonl(path, parse, stats)
+
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            break
+        if kind != "chat_history":
+            # Last record wins for repeated user_ids within a batch
+            batch = list(dict(batch).items())
+        write(batch)
+        stats["records"] += len(batch)
+
+    return _finish(stats, started)
+
+
+def export_jsonl(storage, kind, out):
+    """Stream every record of one kind from storage to a text file object"""
+    rows = {
+        "profiles": ({"user_id": u, "profile": p} for u, p in storage.iter_profiles()),
+        "quiz_results": ({"user_id": u, "result": r} for u, r in storage.iter_quiz_results()),
+        "chat_history": ({"user_id": u, **e} for u, e in storage.iter_chat_messages()),
+    }[kind]
+
+    stats = {"records": 0, "skipped": 0}
+    started = time.time()
+    for record in rows:
+        out.write(json.dumps(record, ensure_ascii=False))
+        out.write("\n")
+        stats["records"] += 1
+
+    return _finish(stats, started)
+
+
+def _finish(stats, started):
+    stats["seconds"] = round(time.time() - started, 3)
+    stats["rate"] = round(stats["records"] / stats["seconds"]) if stats["seconds"] else stats["records"]
+    return stats
+
+
+def import_at_startup(storage, path=STORAGE_IMPORT_PROFILES):
+    """Load the profile file into storage once (called from every worker's startup hook)
+
+    The file's size and mtime are recorded in storage. Workers that find them
+    unchanged, or another worker's import in progress, skip the import.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+    name = f"import:profiles:{os.path.abspath(path)}"
+
+    current = storage.get_meta(name)
+    state = json.loads(current) if current else {}
+    if state.get("signature") == signature and (state.get("done") or time.time() - state["at"] < STORAGE_IMPORT_STALE):
+        return None
+    claim = json.dumps({"signature": signature, "done": False, "at": time.time()})
+    if not storage.compare_and_set_meta(name, current, claim):
+        # Another worker got there first
+        return None
+
+    try:
+        stats = import_jsonl(storage, "profiles", path)
+    except BaseException:
+        storage.compare_and_set_meta(name, claim, current)
+        raise
+    storage.compare_and_set_meta(name, claim, json.dumps({"signature": signature, "done": True, "at": time.time()}))
+    print(f"📥 Imported {stats['records']} profiles from {path} ({stats['rate']} records/s)")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk JSONL import/export for the backend store")
+    parser.add_argument("action", choices=("import", "export"))
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("path", help="JSONL file ('-' for stdout on export)")
+    parser.add_argument("--storage-url", default=None, help="overrides STORAGE_URL")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    storage = create_storage(args.storage_url)
+    try:
+        if args.action == "import":
+            stats = import_jsonl(storage, args.kind, args.path, args.batch_size)
+        elif args.path == "-":
+            stats = export_jsonl(storage, args.kind, sys.stdout)
+        else:
+            with open(args.path, "w", encoding="utf-8") as out:
+                stats = export_jsonl(storage, args.kind, out)
+    finally:
+        storage.close()
+
+    print(f"✅ {args.action.capitalize()}ed {stats['records']} {args.kind} records in {stats['seconds']}s "
+          f"({stats['rate']} records/s, {stats['skipped']} skipped)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Deterministic chat fallback
+Answers from curated Q&A in faq.json and the passages of the RAG bot's text
+files through an in-memory inverted index, in microseconds and without a model.
+Used when the LLM is unavailable or too slow, and by the simple backends.
+"""
+
+import math
+import os
+import re
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FALLBACK_FAQ_PATH = os.environ.get("FALLBACK_FAQ_PATH", os.path.join(BASE_DIR, "faq.json"))
+# Same directory the RAG bot ingests; only its .txt and .md files are indexed here
+FALLBACK_PASSAGES_DIR = os.environ.get("RAG_DATA_DIR", os.path.join(BASE_DIR, "my-rag-bot", "data"))
+# Share of the question's (idf-weighted) terms an entry must contain to be used
+FALLBACK_MIN_SCORE = float(os.environ.get("FALLBACK_MIN_SCORE", "0.5"))
+# Passages rank below curated answers that match as well
+PASSAGE_WEIGHT = 0.8
+
+DEFAULT_ANSWER = "I'm here to help you with digital skills! What would you like to know?"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset("""
+a about am an and any are as at be by can could define do does explain for from get have
+how i in is it know me mean meaning my of on or please should tell that the there this to
+want was what when where which who why will with would you your
+""".split())
+
+
+def _stem(token):
+    # Plurals only: "passwords" and "password" are the same question
+    if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    return [_stem(t) for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def load_faq(path=FALLBACK_FAQ_PATH):
+    """Return (default answer, entries) from the FAQ file; entries are {id, questions, keywords, answer}"""
+    import json
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    entries = data.get("faq", [])
+    for entry in entries:
+        if not entry.get("id") or not entry.get("answer") or not entry.get("questions"):
+            raise ValueError(f"FAQ entry {entry.get('id')!r} needs an id, questions and an answer")
+    return data.get("default", DEFAULT_ANSWER), entries
+
+
+def load_passages(data_dir=FALLBACK_PASSAGES_DIR):
+    """Paragraphs of the knowledge-base text files, as {id, text}"""
+    passages = []
+    if not os.path.isdir(data_dir):
+        return passages
+    for root, _, files in os.walk(data_dir):
+        for name in sorted(files):
+            if not name.lower().endswith((".txt", ".md")):
+                continue
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, data_dir).replace(os.sep, "/")
+            with open(path, encoding="utf-8", errors="replace") as f:
+                paragraphs = [p.strip() for p in re.split(r"\n\s*\n", f.read())]
+            for i, paragraph in enumerate(p for p in paragraphs if p):
+                passages.append({"id": f"{relpath}#{i}", "text": paragraph})
+    return passages
+
+
+class FallbackEngine:
+    """Token inverted index over FAQ entries and passages"""
+
+    def __init__(self, faq=(), passages=(), default=DEFAULT_ANSWER, min_score=FALLBACK_MIN_SCORE):
+        self.default = default
+        self.min_score = min_score
+        # Parallel lists: what to answer, where it came from, and its weight
+        self.answers, self.sources, self.ids, self.weights, self.lengths = [], [], [], [], []
+        postings = {}
+
+        def add(entry_id, source, text, answer, weight):
+            position = len(self.answers)
+            terms = set(tokenize(text))
+            for term in terms:
+                postings.setdefault(term, []).append(position)
+            self.answers.append(answer)
+            self.sources.append(source)
+            self.ids.append(entry_id)
+            self.weights.append(weight)
+            self.lengths.append(len(terms) or 1)
+
+        for entry in faq:
+            text = " ".join(entry["questions"] + entry.get("keywords", []))
+            add(entry["id"], "faq", text, entry["answer"], 1.0)
+        for passage in passages:
+            add(passage["id"], "passage", passage["text"], passage["text"], PASSAGE_WEIGHT)
+
+        self.postings = postings
+        count = len(self.answers)
+        self.idf = {term: math.log(1 + (count + 1) / len(hits)) for term, hits in postings.items()}
+        # Words no entry uses count against a match like the rarest known word
+        self.unknown_idf = math.log(1 + (count + 1))
+
+        self._lock = threading.Lock()
+        self.counts = {"faq": 0, "passage": 0, "default": 0}
+
+    @classmethod
+    def load(cls, faq_path=FALLBACK_FAQ_PATH, passages_dir=FALLBACK_PASSAGES_DIR):
+        try:
+            default, faq = load_faq(faq_path)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Fallback FAQ not loaded ({e}), answering from passages only")
+            default, faq = DEFAULT_ANSWER, []
+        return cls(faq, load_passages(passages_dir), default)
+
+    def answer(self, message):
+        """Best deterministic answer: {"response", "source": faq|passage|default, "match", "score"}"""
+        terms = set(tokenize(message))
+        total = sum(self.idf.get(t, self.unknown_idf) for t in terms)
+        scores = {}
+        for term in terms:
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for position in self.postings[term]:
+                scores[position] = scores.get(position, 0.0) + idf
+
+        best, best_key = None, None
+        for position, matched in scores.items():
+            coverage = matched / total * self.weights[position]
+            # Ties go to the more specific (shorter) entry, then to the earlier one
+            key = (coverage, -self.lengths[position], -position)
+            if best_key is None or key > best_key:
+                best, best_key = position, key
+
+        if best is None or best_key[0] < self.min_score:
+            result = {"response": self.default, "source": "default", "match": None, "score": 0.0}
+        else:
+            result = {
+                "response": self.answers[best],
+                "source": self.sources[best],
+                "match": self.ids[best],
+                "score": round(best_key[0], 3),
+            }
+        with self._lock:
+            self.counts[result["source"]] += 1
+        return result
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self.counts)
+        return {"entries": len(self.answers), "answered": counts}
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Answer cache for the RAG chat
+Serves repeated (and optionally near-identical) questions without calling the LLM
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+ANSWER_CACHE_SIZE = int(os.environ.get("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL = float(os.environ.get("ANSWER_CACHE_TTL", "3600"))
+# Cosine similarity above which a cached answer is reused; empty disables it
+ANSWER_CACHE_SIMILARITY = os.environ.get("ANSWER_CACHE_SIMILARITY", "")
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_question(text):
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = _PUNCTUATION.sub(" ", text.lower())
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class AnswerCache:
+    """Bounded LRU cache of answers with TTL and optional embedding similarity"""
+
+    def __init__(self, max_entries=ANSWER_CACHE_SIZE, ttl_seconds=ANSWER_CACHE_TTL,
+                 similarity_threshold=None, embed=None):
+        if similarity_threshold is None and ANSWER_CACHE_SIMILARITY:
+            similarity_threshold = float(ANSWER_CACHE_SIMILARITY)
+
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.embed = embed
+        self.index_key = None
+
+        self._entries = OrderedDict()  # normalized question -> (answer, expires_at, vector)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def semantic_enabled(self):
+        return self.similarity_threshold is not None and self.embed is not None
+
+    def _live_entry(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] < now:
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        return entry
+
+    def get(self, question):
+        """Exact lookup on the normalized question; cheap enough for the event loop"""
+        key = normalize_question(question)
+        with self._lock:
+            entry = self._live_entry(key, time.time())
+            if entry is None:
+                if not self.semantic_enabled:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def get_similar(self, question):
+        """Embedding lookup; returns (answer or None, query vector for a later put)"""
+        if not self.semantic_enabled:
+            return None, None
+
+        import numpy as np
+
+        vector = np.asarray(self.embed(question), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm:
+            vector /= norm
+
+        with self._lock:
+            now = time.time()
+            keys = [k for k, e in self._entries.items() if e[2] is not None and e[1] >= now]
+            if keys:
+                matrix = np.stack([self._entries[k][2] for k in keys])
+                scores = matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.similarity_threshold:
+                    self._entries.move_to_end(keys[best])
+                    self.semantic_hits += 1
+                    return self._entries[keys[best]][0], vector
+            self.misses += 1
+            return None, vector
+
+    def put(self, question, answer, vector=None):
+        key = normalize_question(question)
+        with self._lock:
+            self._entries[key] = (answer, time.time() + self.ttl_seconds, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def set_index_key(self, index_key):
+        """Drop every cached answer when the index behind them changes"""
+        if index_key != self.index_key:
+            if self.index_key is not None:
+                self.clear()
+            self.index_key = index_key
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "semantic": self.semantic_enabled,
+                "similarity_threshold": self.similarity_threshold,
+                "index_key": self.index_key,
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.semantic_hits) / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Bounded executor for RAG chat work
+Keeps slow LLM and retrieval calls off the event loop and sheds load when full
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+CHAT_MAX_CONCURRENCY = int(os.environ.get("CHAT_MAX_CONCURRENCY", "2"))
+CHAT_MAX_QUEUE = int(os.environ.get("CHAT_MAX_QUEUE", "8"))
+# Seconds a chat may wait for the RAG bot (first token, when streaming) before
+# the fallback engine answers instead; 0 waits as long as it takes
+CHAT_LATENCY_BUDGET = float(os.environ.get("CHAT_LATENCY_BUDGET", "30"))
+
+
+class ChatQueueFull(Exception):
+    """Raised when every worker is busy and the wait queue is full"""
+
+
+class ChatExecutor:
+    """Thread pool with a hard cap on running plus waiting jobs"""
+
+    def __init__(self, max_concurrency=CHAT_MAX_CONCURRENCY, max_queue=CHAT_MAX_QUEUE):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="rag-chat")
+        self._slots = threading.BoundedSemaphore(max_concurrency + max_queue)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn on the pool and return a concurrent future"""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise ChatQueueFull("Chat queue is full")
+
+        with self._lock:
+            self._pending += 1
+        try:
+            future = self._pool.submit(fn, *args, **kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        # Free the slot when the work finishes, not when the caller stops
+        # waiting, so disconnected clients can't oversubscribe the pool
+        future.add_done_callback(self._release)
+        return future
+
+    async def run(self, fn, *args, **kwargs):
+        """Run fn on the pool and await its result from the event loop"""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self):
+        with self._lock:
+            pending = self._pending
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": pending,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
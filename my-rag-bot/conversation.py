@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Conversation memory for the RAG chat
+Each answer sees a token-budgeted window of the user's recent turns plus a
+rolling summary of the turns that no longer fit, so prompt size stays bounded
+however long the chat history grows
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+# Token budget for the summary plus the recent turns that go into the prompt
+CHAT_WINDOW_TOKENS = int(os.environ.get("CHAT_WINDOW_TOKENS", "768"))
+CHAT_SUMMARY_TOKENS = int(os.environ.get("CHAT_SUMMARY_TOKENS", "200"))
+# How many of the newest turns are considered for the window at all
+CHAT_WINDOW_TURNS = int(os.environ.get("CHAT_WINDOW_TURNS", "20"))
+CONVERSATION_USERS = int(os.environ.get("CONVERSATION_USERS", "1024"))
+
+# Requests without a user_id share this one; it never gets a conversation
+ANONYMOUS_USER = "anonymous"
+
+CONVERSATION_PROMPT = """Use the following pieces of context and the conversation so far to answer the question at the end. If you don't know the answer, just say that you don't know, don't try to make up an answer.
+
+{memory}Context:
+{context}
+
+Question: {question}
+Helpful Answer:"""
+
+SUMMARY_PROMPT = """Progressively summarize the conversation between a user and a digital skills assistant, adding onto the previous summary. Keep the topics the user asked about and what they were told. Answer with the new summary only, in at most {words} words.
+
+Previous summary:
+{summary}
+
+New lines of conversation:
+{lines}
+
+New summary:"""
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None:
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            # tiktoken downloads its encoding on first use; offline, estimate instead
+            print(f"⚠️  tiktoken unavailable ({e}), estimating token counts")
+            _encoding = False
+    return _encoding
+
+
+def count_tokens(text):
+    """Token count with tiktoken's cl100k_base (about 4 characters a token without it)"""
+    encoding = _get_encoding()
+    if not encoding:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text, limit):
+    encoding = _get_encoding()
+    if not encoding:
+        return text[:limit * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= limit else encoding.decode(tokens[:limit])
+
+
+def format_turn(turn):
+    return f"User: {turn['user_message']}\nAssistant: {turn['bot_response']}"
+
+
+class Conversation:
+    """What one request knows about the conversation so far"""
+
+    def __init__(self, user_id, summary="", window=(), pending=()):
+        self.user_id = user_id
+        self.summary = summary
+        # Newest turns that fit the token budget, oldest first
+        self.window = list(window)
+        # Turns that fell out of the window but are not in the summary yet
+        self.pending = list(pending)
+
+    @property
+    def is_empty(self):
+        return not self.summary and not self.window
+
+    def retrieval_query(self, question):
+        """Follow-ups like "how do I do that?" retrieve with the previous question attached"""
+        if not self.window:
+            return question
+        return f"{self.window[-1]['user_message']}\n{question}"
+
+    def prompt(self, context, question):
+        memory = ""
+        if self.summary:
+            memory += f"Summary of the earlier conversation:\n{self.summary}\n\n"
+        if self.window:
+            memory += "Recent conversation:\n" + "\n".join(format_turn(t) for t in self.window) + "\n\n"
+        return CONVERSATION_PROMPT.format(memory=memory, context=context, question=question)
+
+
+class ConversationMemory:
+    """Builds Conversations from stored chat history and keeps rolling summaries
+
+    Summaries are kept per process (LRU, CONVERSATION_USERS entries); after a
+    restart they are rebuilt from the turns that no longer fit the window.
+    """
+
+    def __init__(self, storage, window_tokens=CHAT_WINDOW_TOKENS, window_turns=CHAT_WINDOW_TURNS,
+                 summary_tokens=CHAT_SUMMARY_TOKENS, max_users=CONVERSATION_USERS):
+        self.storage = storage
+        self.window_tokens = window_tokens
+        self.window_turns = window_turns
+        self.summary_tokens = summary_tokens
+        self.max_users = max_users
+        # user_id -> (summary, timestamp of the newest summarized turn)
+        self._summaries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, user_id):
+        if user_id == ANONYMOUS_USER:
+            return Conversation(user_id)
+
+        # The newest page is usually served from the storage's in-memory tail
+        turns, _ = self.storage.get_chat_page(user_id, self.window_turns)
+        with self._lock:
+            summary, summarized_until = self._summaries.get(user_id, ("", None))
+
+        used = count_tokens(summary)
+        start = len(turns)
+        while start > 0:
+            cost = count_tokens(format_turn(turns[start - 1]))
+            if used + cost > self.window_tokens:
+                break
+            used += cost
+            start -= 1
+
+        pending = [t for t in turns[:start] if summarized_until is None or t["timestamp"] > summarized_until]
+        return Conversation(user_id, summary, turns[start:], pending)
+
+    def summarize(self, llm, conversation):
+        """Fold turns that left the window into the rolling summary (run after answering)"""
+        if not conversation.pending:
+            return
+        prompt = SUMMARY_PROMPT.format(
+            words=int(self.summary_tokens * 0.75),
+            summary=conversation.summary or "(none yet)",
+            lines="\n".join(format_turn(t) for t in conversation.pending),
+        )
+        summary = truncate_tokens(llm.invoke(prompt).strip(), self.summary_tokens)
+
+        summarized_until = conversation.pending[-1]["timestamp"]
+        with self._lock:
+            current = self._summaries.get(conversation.user_id)
+            if current is not None and current[1] >= summarized_until:
+                # A concurrent request already summarized these turns
+                return
+            self._summaries[conversation.user_id] = (summary, summarized_until)
+            self._summaries.move_to_end(conversation.user_id)
+            while len(self._summaries) > self.max_users:
+                self._summaries.popitem(last=False)
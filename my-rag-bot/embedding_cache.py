@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Content-addressed embedding cache for index builds
+Stores one float32 vector per (model, chunk text) on disk and embeds only cache misses
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.embeddings import Embeddings
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", os.path.join(BASE_DIR, "embedding_cache"))
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_CONCURRENCY = int(os.environ.get("EMBEDDING_CONCURRENCY", "4"))
+
+VECTORS_FILE = "vectors.f32"
+KEYS_FILE = "keys.txt"
+META_FILE = "meta.json"
+LOCK_FILE = ".lock"
+
+
+def text_key(model, text):
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only vector file plus a parallel key list, one directory per model"""
+
+    def __init__(self, model, cache_dir=EMBEDDING_CACHE_DIR):
+        self.model = model
+        self.path = os.path.join(cache_dir, re.sub(r"[^\w.-]", "_", model))
+        self.dim = None
+        self._rows = {}
+        self._vectors = None
+        # Bytes of keys.txt already in _rows; _load only reads what was appended after them
+        self._keys_offset = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def _load(self):
+        """Pick up keys appended to keys.txt since the last call (all of them the first time)"""
+        if self.dim is None:
+            if not os.path.exists(self._file(META_FILE)):
+                return
+            with open(self._file(META_FILE), encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+        if not os.path.exists(self._file(KEYS_FILE)):
+            return
+        with open(self._file(KEYS_FILE), "rb") as f:
+            f.seek(self._keys_offset)
+            lines = f.read().split(b"\n")[:-1]
+
+        # Vectors are written before keys, so trust only rows present in both;
+        # anything past that is read again next time
+        rows = os.path.getsize(self._file(VECTORS_FILE)) // (4 * self.dim)
+        lines = lines[:max(rows - len(self._rows), 0)]
+        for line in lines:
+            self._rows[line.decode("ascii")] = len(self._rows)
+        self._keys_offset += sum(len(line) + 1 for line in lines)
+        if lines:
+            self._map()
+
+    def _map(self):
+        import numpy as np
+
+        self._vectors = np.memmap(self._file(VECTORS_FILE), dtype=np.float32, mode="r",
+                                  shape=(len(self._rows), self.dim))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def get_many(self, keys):
+        """Return {key: vector} for the keys present in the cache"""
+        with self._lock:
+            return {k: self._vectors[self._rows[k]].tolist() for k in keys if k in self._rows}
+
+    def put_many(self, items):
+        """Append (key, vector) pairs; concurrent writers are serialized with a file lock"""
+        import numpy as np
+
+        if not items:
+            return
+        with self._lock, open(self._file(LOCK_FILE), "w") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            # Pick up rows other processes appended since we last looked
+            self._load()
+            items = [(k, v) for k, v in items if k not in self._rows]
+            if not items:
+                return
+
+            matrix = np.asarray([v for _, v in items], dtype=np.float32)
+            if self.dim is None:
+                self.dim = matrix.shape[1]
+                with open(self._file(META_FILE), "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model, "dim": self.dim}, f)
+
+            # Drop any vector rows left behind by a writer that died before its keys landed
+            if os.path.exists(self._file(VECTORS_FILE)):
+                os.truncate(self._file(VECTORS_FILE), len(self._rows) * 4 * self.dim)
+            with open(self._file(VECTORS_FILE), "ab") as f:
+                f.write(matrix.tobytes())
+            keys = "".join(f"{k}\n" for k, _ in items).encode("ascii")
+            with open(self._file(KEYS_FILE), "ab") as f:
+                # Keys of a writer that died mid-batch: drop them, their vectors were truncated
+                f.truncate(self._keys_offset)
+                f.write(keys)
+
+            # Under the file lock nobody else appended, so our rows follow the ones we know
+            for key, _ in items:
+                self._rows[key] = len(self._rows)
+            self._keys_offset += len(keys)
+            self._map()
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an Embeddings model, serving known chunks from disk and batching the rest"""
+
+    def __init__(self, embedding, model, cache_dir=EMBEDDING_CACHE_DIR,
+                 batch_size=EMBEDDING_BATCH_SIZE, max_workers=EMBEDDING_CONCURRENCY):
+        self.embedding = embedding
+        self.model = model
+        self.store = EmbeddingStore(model, cache_dir)
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts):
+        keys = [text_key(self.model, t) for t in texts]
+        vectors = self.store.get_many(keys)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        hits = sum(1 for k in keys if k in vectors)
+        self.hits += hits
+        self.misses += len(missing)
+
+        if missing:
+            missing_keys = list(missing)
+            batches = [missing_keys[i:i + self.batch_size]
+                       for i in range(0, len(missing_keys), self.batch_size)]
+            print(f"🧮 Embedding {len(missing_keys)} new chunks in {len(batches)} batches "
+                  f"({hits} cached)...")
+
+            def embed_batch(batch):
+                result = self.embedding.embed_documents([missing[k] for k in batch])
+                self.store.put_many(list(zip(batch, result)))
+                return batch, result
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for batch, result in pool.map(embed_batch, batches):
+                    vectors.update(zip(batch, result))
+
+        return [vectors[k] for k in keys]
+
+    def embed_query(self, text):
+        return self.embedding.embed_query(text)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Recall vs latency report for the FAISS index types in index_types.py
+
+Usage:
+    python my-rag-bot/index_benchmark.py                       # vectors of the live index
+    python my-rag-bot/index_benchmark.py --synthetic 200000 --dim 384
+    python my-rag-bot/index_benchmark.py --synthetic 50000 --types ivf --nprobe 1,4,16,64
+
+Queries are corpus vectors with a little noise added; recall@k is measured
+against exact (flat) search, latency one query at a time like the chat does.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import faiss
+import numpy as np
+
+from index_types import INDEX_TYPES, build_index, tune_index
+
+
+def live_vectors():
+    """Vectors of the persisted index (reconstructed, so PQ indexes give approximations)"""
+    from index_store import INDEX_DIR, INDEX_FILE, read_current
+
+    manifest = read_current()
+    if manifest is None:
+        raise SystemExit("No index yet - run python my-rag-bot/ingest.py first, or use --synthetic")
+    index = faiss.read_index(os.path.join(INDEX_DIR, manifest["key"][:16], INDEX_FILE))
+    try:
+        # IVF indexes can only reconstruct through a direct map
+        faiss.extract_index_ivf(index).make_direct_map()
+    except RuntimeError:
+        pass
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def synthetic_vectors(count, dim, seed=0):
+    """Clustered vectors, closer to real embeddings than uniform noise"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, count // 500), dim)).astype(np.float32)
+    labels = rng.integers(0, len(centers), size=count)
+    return centers[labels] + 0.3 * rng.normal(size=(count, dim)).astype(np.float32)
+
+
+def measure(index, queries, truth, k):
+    latencies = []
+    found = 0
+    for query, expected in zip(queries, truth):
+        started = time.perf_counter()
+        _, ids = index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - started)
+        found += len(set(ids[0]) & set(expected))
+    latencies = np.array(latencies) * 1000
+    return found / truth.size, float(latencies.mean()), float(np.percentile(latencies, 99))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare FAISS index types on recall and latency")
+    parser.add_argument("--synthetic", type=int, default=0, help="use N synthetic vectors instead of the live index")
+    parser.add_argument("--dim", type=int, default=384, help="dimension of synthetic vectors")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--types", default=",".join(INDEX_TYPES))
+    parser.add_argument("--nprobe", default="1,4,16,64", help="IVF cells visited per query")
+    parser.add_argument("--ef", default="16,64,256", help="HNSW efSearch values")
+    args = parser.parse_args(argv)
+
+    vectors = synthetic_vectors(args.synthetic, args.dim) if args.synthetic else live_vectors()
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    count, dim = vectors.shape
+
+    rng = np.random.default_rng(1)
+    picks = rng.choice(count, size=min(args.queries, count), replace=False)
+    queries = vectors[picks] + 0.05 * rng.normal(size=(len(picks), dim)).astype(np.float32)
+
+    exact = build_index(vectors, "flat")
+    _, truth = exact.search(queries, args.k)
+
+    print(f"📏 {count} vectors x {dim} dims, {len(queries)} queries, recall@{args.k} against exact search\n")
+    print(f"{'index':<8} {'setting':<12} {'recall':>7} {'mean ms':>9} {'p99 ms':>9} {'size MB':>9} {'build s':>8}")
+
+    for index_type in args.types.split(","):
+        if index_type == "ivfpq" and count < 10000:
+            print(f"{index_type:<8} skipped: PQ training needs at least 10000 vectors")
+            continue
+        started = time.time()
+        index = build_index(vectors, index_type)
+        build_seconds = time.time() - started
+        size_mb = len(faiss.serialize_index(index)) / 1e6
+
+        if index_type in ("ivf", "ivfpq"):
+            settings = [("nprobe", int(v)) for v in args.nprobe.split(",")]
+        elif index_type == "hnsw":
+            settings = [("efSearch", int(v)) for v in args.ef.split(",")]
+        else:
+            settings = [("exact", None)]
+
+        for name, value in settings:
+            if name == "nprobe":
+                tune_index(index, nprobe=value)
+            elif name == "efSearch":
+                tune_index(index, ef_search=value)
+            recall, mean_ms, p99_ms = measure(index, queries, truth, args.k)
+            label = name if value is None else f"{name}={value}"
+            print(f"{index_type:<8} {label:<12} {recall:>7.3f} {mean_ms:>9.3f} {p99_ms:>9.3f} "
+                  f"{size_mb:>9.1f} {build_seconds:>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
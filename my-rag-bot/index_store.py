@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Persistent FAISS index store for the RAG bot
+Keeps the vector index, chunk metadata and a per-file manifest on disk between starts
+"""
+
+import hashlib
+import json
+import os
+import shutil
+
+from index_types import FAISS_INDEX_TYPE, convert_index, tune_index
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.environ.get("RAG_DATA_DIR", os.path.join(BASE_DIR, "data"))
+INDEX_DIR = os.environ.get("RAG_INDEX_DIR", os.path.join(BASE_DIR, "index"))
+
+# Index build settings - any change here forces a full rebuild
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
+EMBEDDING_MODEL = "llama3"
+
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.json"
+MANIFEST_FILE = "manifest.json"
+LEXICAL_FILE = "bm25.json"
+CURRENT_FILE = "CURRENT"
+
+
+def settings_key(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, embedding_model=EMBEDDING_MODEL,
+                 index_type=FAISS_INDEX_TYPE):
+    """Hash of everything besides the corpus that determines the index contents"""
+    settings = {
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "embedding_model": embedding_model,
+        "index_type": index_type,
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def content_key(settings, files):
+    """Key for one index generation: the settings plus every source file's hash"""
+    digest = hashlib.sha256(settings.encode("utf-8"))
+    for path in sorted(files):
+        digest.update(f"\0{path}\0{files[path]['sha256']}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def chunk_id(source, position, text):
+    """Stable id for a chunk, derived from where it came from and what it says"""
+    raw = f"{source}\0{position}\0{text}".encode("utf-8")
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+
+def read_current(index_dir=INDEX_DIR):
+    """Return the manifest of the live index generation, or None if there is none"""
+    try:
+        with open(os.path.join(index_dir, CURRENT_FILE), encoding="utf-8") as f:
+            name = f.read().strip()
+        with open(os.path.join(index_dir, name, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def load_index(embedding, manifest, index_dir=INDEX_DIR, mmap=True):
+    """Load a persisted index; read-only loads memory-map the vectors where FAISS allows it"""
+    import faiss
+    from langchain_community.vectorstores import FAISS
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_core.documents import Document
+
+    path = os.path.join(index_dir, manifest["key"][:16])
+    index_file = os.path.join(path, INDEX_FILE)
+
+    if mmap:
+        try:
+            index = faiss.read_index(index_file, faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            index = faiss.read_index(index_file)
+    else:
+        index = faiss.read_index(index_file)
+    tune_index(index)
+
+    with open(os.path.join(path, CHUNKS_FILE), encoding="utf-8") as f:
+        chunks = json.load(f)
+
+    docstore = InMemoryDocstore({
+        c["id"]: Document(page_content=c["text"], metadata=c["metadata"]) for c in chunks
+    })
+    index_to_docstore_id = {i: c["id"] for i, c in enumerate(chunks)}
+
+    return FAISS(
+        embedding_function=embedding,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id,
+    )
+
+
+def write_index(vectorstore, manifest, index_dir=INDEX_DIR):
+    """Persist a new index generation and atomically make it the live one"""
+    import faiss
+    from lexical_index import BM25Index
+
+    os.makedirs(index_dir, exist_ok=True)
+    name = manifest["key"][:16]
+    final_path = os.path.join(index_dir, name)
+    tmp_path = f"{final_path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    # Ingestion works on a flat index; serve whatever type the manifest asks for
+    vectorstore.index = convert_index(vectorstore.index, manifest.get("index_type", "flat"))
+    faiss.write_index(vectorstore.index, os.path.join(tmp_path, INDEX_FILE))
+
+    # Chunks are written in index position order so load_index can rebuild the mapping
+    chunks = []
+    for position in range(vectorstore.index.ntotal):
+        doc_id = vectorstore.index_to_docstore_id[position]
+        doc = vectorstore.docstore.search(doc_id)
+        chunks.append({"id": doc_id, "text": doc.page_content, "metadata": doc.metadata})
+    with open(os.path.join(tmp_path, CHUNKS_FILE), "w", encoding="utf-8") as f:
+        json.dump(chunks, f, ensure_ascii=False)
+
+    # The keyword index is built from the same chunks, so both stay in step
+    BM25Index.from_chunks(chunks).save(os.path.join(tmp_path, LEXICAL_FILE))
+
+    manifest["chunks"] = len(chunks)
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+    if os.path.exists(final_path):
+        # Same content was already written (e.g. by another worker)
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    else:
+        os.replace(tmp_path, final_path)
+
+    # Flip the CURRENT pointer last, so readers only ever see complete generations
+    current_tmp = os.path.join(index_dir, f"{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(current_tmp, "w", encoding="utf-8") as f:
+        f.write(name)
+    os.replace(current_tmp, os.path.join(index_dir, CURRENT_FILE))
+
+    _prune_stale_indexes(index_dir, keep=name)
+
+
+def _prune_stale_indexes(index_dir, keep):
+    """Remove older index generations (in-progress temp dirs are left alone)"""
+    for name in os.listdir(index_dir):
+        path = os.path.join(index_dir, name)
+        if name != keep and ".tmp-" not in name and os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+FAISS index types for the RAG index
+Ingestion always works on an exact flat index; when a generation is written it
+is converted to the serving index type chosen here, with any training done on
+the full set of vectors at that point.
+
+FAISS_INDEX_TYPE:
+    auto   flat below FAISS_IVF_THRESHOLD chunks, ivf below FAISS_PQ_THRESHOLD, ivfpq above
+    flat   exact search, memory = chunks x dim x 4 bytes
+    ivf    inverted lists over k-means cells; search visits FAISS_NPROBE cells
+    hnsw   graph search tuned by FAISS_EF_SEARCH; fastest queries, most memory
+    ivfpq  ivf with product-quantized vectors (FAISS_PQ_M bytes per vector)
+"""
+
+import math
+import os
+
+FAISS_INDEX_TYPE = os.environ.get("FAISS_INDEX_TYPE", "auto").lower()
+FAISS_IVF_THRESHOLD = int(os.environ.get("FAISS_IVF_THRESHOLD", "50000"))
+FAISS_PQ_THRESHOLD = int(os.environ.get("FAISS_PQ_THRESHOLD", "1000000"))
+FAISS_NPROBE = int(os.environ.get("FAISS_NPROBE", "16"))
+FAISS_EF_SEARCH = int(os.environ.get("FAISS_EF_SEARCH", "64"))
+FAISS_HNSW_M = int(os.environ.get("FAISS_HNSW_M", "32"))
+FAISS_PQ_M = int(os.environ.get("FAISS_PQ_M", "64"))
+# Upper bound on vectors used for k-means / PQ training
+FAISS_TRAIN_SIZE = int(os.environ.get("FAISS_TRAIN_SIZE", "100000"))
+
+INDEX_TYPES = ("flat", "ivf", "hnsw", "ivfpq")
+
+
+def resolve_index_type(count, configured=FAISS_INDEX_TYPE):
+    """The concrete index type for a corpus of `count` chunks"""
+    if configured in INDEX_TYPES:
+        # Too few vectors to train on: k-means cells need ~39 points each and
+        # PQ's 256 centroids per sub-quantizer need ~10k
+        if configured == "ivfpq" and count < 10000:
+            configured = "ivf"
+        if configured == "ivf" and count < 1000:
+            configured = "flat"
+        return configured
+    if configured != "auto":
+        raise ValueError(f"Unknown FAISS_INDEX_TYPE {configured!r}, expected auto or one of {INDEX_TYPES}")
+    if count < FAISS_IVF_THRESHOLD:
+        return "flat"
+    if count < FAISS_PQ_THRESHOLD:
+        return "ivf"
+    return "ivfpq"
+
+
+def _nlist(count):
+    # About 4 * sqrt(n) cells, with at least ~39 training points per cell
+    return max(1, min(int(4 * math.sqrt(count)), count // 39))
+
+
+def _pq_m(dim, wanted=FAISS_PQ_M):
+    # PQ needs the sub-quantizer count to divide the dimension
+    return max(m for m in range(1, min(wanted, dim) + 1) if dim % m == 0)
+
+
+def factory_string(index_type, count, dim):
+    if index_type == "flat":
+        return "Flat"
+    if index_type == "ivf":
+        return f"IVF{_nlist(count)},Flat"
+    if index_type == "hnsw":
+        return f"HNSW{FAISS_HNSW_M}"
+    if index_type == "ivfpq":
+        return f"IVF{_nlist(count)},PQ{_pq_m(dim)}"
+    raise ValueError(f"Unknown index type {index_type!r}")
+
+
+def build_index(vectors, index_type):
+    """Build (and train, if needed) an index of the given type over float32 vectors"""
+    import faiss
+    import numpy as np
+
+    count, dim = vectors.shape
+    index = faiss.index_factory(dim, factory_string(index_type, count, dim), faiss.METRIC_L2)
+    if not index.is_trained:
+        sample = vectors
+        if count > FAISS_TRAIN_SIZE:
+            rows = np.random.default_rng(0).choice(count, FAISS_TRAIN_SIZE, replace=False)
+            sample = vectors[np.sort(rows)]
+        index.train(sample)
+    index.add(vectors)
+    tune_index(index)
+    return index
+
+
+def convert_index(index, index_type):
+    """Rebuild a flat index as index_type, keeping vector positions (and so docstore ids) intact"""
+    if index_type == "flat":
+        return index
+    vectors = index.reconstruct_n(0, index.ntotal)
+    return build_index(vectors, index_type)
+
+
+def tune_index(index, nprobe=FAISS_NPROBE, ef_search=FAISS_EF_SEARCH):
+    """Apply the search-time knobs; harmless for index types that don't have them"""
+    import faiss
+
+    try:
+        faiss.extract_index_ivf(index).nprobe = nprobe
+    except RuntimeError:
+        pass
+    hnsw = getattr(faiss.downcast_index(index), "hnsw", None)
+    if hnsw is not None:
+        hnsw.efSearch = ef_search
+    return index
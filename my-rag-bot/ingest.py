@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Incremental ingestion pipeline for the RAG bot
+Scans the data directory, re-chunks only added or changed files and applies the
+difference to the persisted FAISS index
+
+Usage:
+    python my-rag-bot/ingest.py            # apply changes in my-rag-bot/data/
+    python my-rag-bot/ingest.py --full     # re-chunk every file (embeddings stay cached)
+    python my-rag-bot/ingest.py --dry-run  # only report what would change
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from index_store import (
+    DATA_DIR, INDEX_DIR, CHUNK_SIZE, CHUNK_OVERLAP, EMBEDDING_MODEL,
+    settings_key, content_key, file_sha256, chunk_id, read_current, load_index, write_index,
+)
+from index_types import resolve_index_type
+
+SUPPORTED_EXTENSIONS = {".txt", ".md", ".markdown", ".pdf"}
+INGEST_BATCH_SIZE = int(os.environ.get("INGEST_BATCH_SIZE", "256"))
+
+
+def scan_sources(data_dir=DATA_DIR):
+    """Yield (relative path, absolute path, stat) for every supported file under data_dir"""
+    for root, dirs, files in os.walk(data_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if name.startswith(".") or os.path.splitext(name)[1].lower() not in SUPPORTED_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, data_dir).replace(os.sep, "/")
+            yield relpath, path, os.stat(path)
+
+
+def plan_changes(known_files, data_dir=DATA_DIR):
+    """Compare the data directory against the manifest's file table
+
+    Files whose mtime and size are unchanged are trusted without hashing; the
+    rest are hashed so a touched-but-identical file is not re-embedded.
+    """
+    plan = {"added": {}, "changed": {}, "deleted": [], "unchanged": {}}
+    seen = set()
+
+    for relpath, path, stat in scan_sources(data_dir):
+        seen.add(relpath)
+        known = known_files.get(relpath)
+        entry = {"mtime": stat.st_mtime, "size": stat.st_size}
+
+        if known and known["mtime"] == stat.st_mtime and known["size"] == stat.st_size:
+            plan["unchanged"][relpath] = known
+            continue
+
+        entry["sha256"] = file_sha256(path)
+        if known is None:
+            plan["added"][relpath] = entry
+        elif known["sha256"] == entry["sha256"]:
+            entry["chunks"] = known["chunks"]
+            plan["unchanged"][relpath] = entry
+        else:
+            plan["changed"][relpath] = entry
+
+    plan["deleted"] = sorted(set(known_files) - seen)
+    return plan
+
+
+def has_changes(plan):
+    return bool(plan["added"] or plan["changed"] or plan["deleted"])
+
+
+def load_file_documents(path, relpath):
+    """Load one source file with a loader suited to its type"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".pdf":
+        # PDFs go through the unstructured dependency
+        from langchain_community.document_loaders import UnstructuredPDFLoader
+        loader = UnstructuredPDFLoader(path)
+    else:
+        from langchain_community.document_loaders import TextLoader
+        loader = TextLoader(path, encoding="utf-8")
+
+    docs = loader.load()
+    for doc in docs:
+        doc.metadata["source"] = relpath
+    return docs
+
+
+def iter_file_chunks(files, data_dir=DATA_DIR, chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP):
+    """Stream (relpath, chunks, ids) one file at a time so memory stays bounded"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for relpath in files:
+        path = os.path.join(data_dir, relpath)
+        chunks = splitter.split_documents(load_file_documents(path, relpath))
+        ids = [chunk_id(relpath, i, c.page_content) for i, c in enumerate(chunks)]
+        yield relpath, chunks, ids
+
+
+def _add_batch(vectorstore, embedding, docs, ids):
+    from langchain_community.vectorstores import FAISS
+
+    if vectorstore is None:
+        return FAISS.from_documents(docs, embedding=embedding, ids=ids)
+    vectorstore.add_documents(docs, ids=ids)
+    return vectorstore
+
+
+def sync_index(embedding=None, data_dir=DATA_DIR, index_dir=INDEX_DIR,
+               embedding_model=EMBEDDING_MODEL, full=False, dry_run=False):
+    """Bring the persisted index in line with the data directory
+
+    Returns (vectorstore, manifest, plan). With nothing to do, the live index is
+    opened memory-mapped and nothing is embedded.
+    """
+    from embedding_cache import CachedEmbeddings
+
+    if embedding is None:
+        from langchain_community.embeddings import OllamaEmbeddings
+        from llm_client import OLLAMA_HOST
+        embedding = OllamaEmbeddings(model=embedding_model, base_url=OLLAMA_HOST)
+
+    settings = settings_key(embedding_model=embedding_model)
+    manifest = read_current(index_dir)
+    if manifest is not None and manifest.get("settings_key") != settings:
+        print("♻️  Chunk settings or embedding model changed - rebuilding index...")
+        manifest = None
+    if full:
+        manifest = None
+
+    known_files = manifest["files"] if manifest else {}
+    plan = plan_changes(known_files, data_dir)
+
+    if dry_run:
+        return None, manifest, plan
+
+    if manifest is not None and not has_changes(plan):
+        print(f"📂 Loading FAISS index {manifest['key'][:16]} from disk...")
+        return load_index(embedding, manifest, index_dir), manifest, plan
+
+    print(f"📥 Ingesting: {len(plan['added'])} added, {len(plan['changed'])} changed, "
+          f"{len(plan['deleted'])} deleted, {len(plan['unchanged'])} unchanged")
+
+    # Only flat indexes are updated in place; trained ones (IVF, HNSW, PQ) are
+    # rebuilt from all files, which costs no embedding calls thanks to the cache
+    rebuild = manifest is not None and manifest.get("index_type", "flat") != "flat"
+    vectorstore = load_index(embedding, manifest, index_dir, mmap=False) if manifest and not rebuild else None
+
+    # Remove chunks of changed and deleted files first
+    stale_ids = []
+    for relpath in list(plan["changed"]) + plan["deleted"]:
+        stale_ids.extend(known_files[relpath]["chunks"])
+    if vectorstore is not None and stale_ids:
+        vectorstore.delete(stale_ids)
+
+    # Then stream in the new chunks, embedding through the on-disk cache
+    cached_embedding = CachedEmbeddings(embedding, embedding_model)
+    files = {} if rebuild else dict(plan["unchanged"])
+    pending_docs, pending_ids = [], []
+    to_ingest = {**plan["added"], **plan["changed"]}
+    if rebuild:
+        to_ingest = {**plan["unchanged"], **to_ingest}
+
+    for relpath, chunks, ids in iter_file_chunks(to_ingest, data_dir):
+        files[relpath] = {**to_ingest[relpath], "chunks": ids}
+        pending_docs.extend(chunks)
+        pending_ids.extend(ids)
+        if len(pending_docs) >= INGEST_BATCH_SIZE:
+            vectorstore = _add_batch(vectorstore, cached_embedding, pending_docs, pending_ids)
+            pending_docs, pending_ids = [], []
+    if pending_docs:
+        vectorstore = _add_batch(vectorstore, cached_embedding, pending_docs, pending_ids)
+
+    if vectorstore is None or vectorstore.index.ntotal == 0:
+        raise RuntimeError(f"No documents to index in {data_dir}")
+
+    # Queries embed through the plain model
+    vectorstore.embedding_function = embedding
+
+    manifest = {
+        "key": content_key(settings, files),
+        "settings_key": settings,
+        "embedding_model": embedding_model,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "index_type": resolve_index_type(vectorstore.index.ntotal),
+        "files": files,
+    }
+    write_index(vectorstore, manifest, index_dir)
+    return vectorstore, manifest, plan
+
+
+def load_or_build_vectorstore(embedding=None, data_dir=DATA_DIR, index_dir=INDEX_DIR,
+                              embedding_model=EMBEDDING_MODEL):
+    """Open the persisted index, ingesting whatever changed in the data directory"""
+    vectorstore, _, _ = sync_index(embedding, data_dir, index_dir, embedding_model)
+    return vectorstore
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest my-rag-bot/data/ into the persisted FAISS index")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory of .txt/.md/.pdf sources")
+    parser.add_argument("--index-dir", default=INDEX_DIR, help="where the index is stored")
+    parser.add_argument("--model", default=EMBEDDING_MODEL, help="Ollama embedding model")
+    parser.add_argument("--full", action="store_true", help="re-chunk every file")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would change")
+    args = parser.parse_args(argv)
+
+    started = time.time()
+    _, manifest, plan = sync_index(data_dir=args.data_dir, index_dir=args.index_dir,
+                                   embedding_model=args.model, full=args.full, dry_run=args.dry_run)
+
+    for label in ("added", "changed"):
+        for relpath in plan[label]:
+            print(f"  {label:>9}: {relpath}")
+    for relpath in plan["deleted"]:
+        print(f"  {'deleted':>9}: {relpath}")
+
+    if args.dry_run:
+        print(f"🔍 Dry run - {'changes pending' if has_changes(plan) else 'index is up to date'}")
+    else:
+        print(f"✅ Index {manifest['key'][:16]} holds {manifest['chunks']} chunks "
+              f"from {len(manifest['files'])} files in a {manifest['index_type']} index "
+              f"({time.time() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
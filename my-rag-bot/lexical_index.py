@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+BM25 keyword index and hybrid retrieval for the RAG bot
+The BM25 index is built at ingest time next to the FAISS index. Short keyword
+queries with a clear lexical winner are answered from it without calling the
+embedder; everything else fuses BM25 and vector results with reciprocal-rank
+fusion.
+"""
+
+import json
+import math
+import os
+import re
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from index_store import INDEX_DIR, LEXICAL_FILE
+
+RETRIEVAL_K = int(os.environ.get("RETRIEVAL_K", "4"))
+# Candidates taken from each retriever before fusion
+RETRIEVAL_FETCH_K = int(os.environ.get("RETRIEVAL_FETCH_K", "20"))
+RRF_K = 60
+# Lexical fast path: at most this many query terms, every term in the top chunk,
+# and the top score this many times the runner-up's
+LEXICAL_MAX_TERMS = int(os.environ.get("LEXICAL_MAX_TERMS", "4"))
+LEXICAL_MARGIN = float(os.environ.get("LEXICAL_MARGIN", "1.5"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it me my of on or should
+the this to was what when where which who why will with you your
+""".split())
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Inverted index over chunk texts, addressed by docstore id"""
+
+    def __init__(self, ids, lengths, postings):
+        self.ids = ids
+        self.lengths = lengths
+        # term -> [[chunk position, term frequency], ...]
+        self.postings = postings
+        self.average_length = sum(lengths) / len(lengths) if lengths else 0.0
+        n = len(ids)
+        self.idf = {
+            term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in postings.items()
+        }
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Build from [{"id", "text"}, ...] as written by index_store.write_index"""
+        ids, lengths, postings = [], [], {}
+        for position, chunk in enumerate(chunks):
+            terms = tokenize(chunk["text"])
+            ids.append(chunk["id"])
+            lengths.append(len(terms))
+            counts = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append([position, tf])
+        return cls(ids, lengths, postings)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"ids": self.ids, "lengths": self.lengths, "postings": self.postings}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["ids"], data["lengths"], data["postings"])
+
+    def search(self, query, k):
+        """Return [(chunk position, score, matched term count), ...] best first, and the query terms"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        scores, matched = {}, {}
+        for term in terms:
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for position, tf in self.postings[term]:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[position] / self.average_length)
+                scores[position] = scores.get(position, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                matched[position] = matched.get(position, 0) + 1
+        best = sorted(scores, key=scores.get, reverse=True)[:k]
+        return [(position, scores[position], matched[position]) for position in best], terms
+
+
+def load_lexical_index(vectorstore, manifest, index_dir=INDEX_DIR):
+    """BM25 index for an index generation; built from the docstore if it predates bm25.json"""
+    path = os.path.join(index_dir, manifest["key"][:16], LEXICAL_FILE)
+    if os.path.exists(path):
+        return BM25Index.load(path)
+    chunks = [
+        {"id": doc_id, "text": vectorstore.docstore.search(doc_id).page_content}
+        for _, doc_id in sorted(vectorstore.index_to_docstore_id.items())
+    ]
+    return BM25Index.from_chunks(chunks)
+
+
+class HybridRetriever(BaseRetriever):
+    """BM25 fast path for keyword queries, reciprocal-rank fusion of BM25 and FAISS otherwise"""
+
+    vectorstore: Any
+    lexical: Any
+    k: int = RETRIEVAL_K
+    fetch_k: int = RETRIEVAL_FETCH_K
+    lexical_hits: int = 0
+    fused: int = 0
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        lexical, terms = self.lexical.search(query, self.fetch_k)
+        ids = self.lexical.ids
+
+        if self._confident(lexical, terms):
+            self.lexical_hits += 1
+            return [self._document(ids[position]) for position, _, _ in lexical[:self.k]]
+
+        self.fused += 1
+        ranks = {}
+        for rank, (position, _, _) in enumerate(lexical):
+            ranks[ids[position]] = 1.0 / (RRF_K + rank + 1)
+        for rank, doc_id in enumerate(self._vector_search(query)):
+            ranks[doc_id] = ranks.get(doc_id, 0.0) + 1.0 / (RRF_K + rank + 1)
+
+        best = sorted(ranks, key=ranks.get, reverse=True)[:self.k]
+        return [self._document(doc_id) for doc_id in best]
+
+    def _confident(self, lexical, terms):
+        """A short query whose best chunk contains every term and clearly beats the rest"""
+        if not lexical or not terms or len(terms) > LEXICAL_MAX_TERMS:
+            return False
+        _, top_score, top_matched = lexical[0]
+        if top_matched < len(terms):
+            return False
+        return len(lexical) == 1 or top_score >= LEXICAL_MARGIN * lexical[1][1]
+
+    def _vector_search(self, query):
+        """FAISS neighbours as docstore ids, nearest first (this is the embedding call)"""
+        import numpy as np
+
+        vector = np.asarray([self.vectorstore.embedding_function.embed_query(query)], dtype=np.float32)
+        _, indices = self.vectorstore.index.search(vector, self.fetch_k)
+        return [self.vectorstore.index_to_docstore_id[i] for i in indices[0] if i != -1]
+
+    def _document(self, doc_id):
+        return self.vectorstore.docstore.search(doc_id)
+
+    def stats(self):
+        return {"lexical_fast_path": self.lexical_hits, "fused": self.fused}
+
+
+def hybrid_retriever(vectorstore, manifest, index_dir=INDEX_DIR, k=RETRIEVAL_K):
+    lexical = load_lexical_index(vectorstore, manifest, index_dir)
+    return HybridRetriever(vectorstore=vectorstore, lexical=lexical, k=k, fetch_k=max(k, RETRIEVAL_FETCH_K))
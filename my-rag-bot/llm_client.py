@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Ollama client for the RAG bot
+One keep-alive HTTP connection pool for all generations, timeouts and retries
+on connection errors, and single-flight coalescing: identical prompts that
+arrive while one is already being generated share that generation (streamed
+to every caller) instead of asking the model N times.
+
+Point OLLAMA_HOST at stub_ollama.py to run the whole chat path without a model.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Iterator, List, Optional
+
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.llms import LLM
+from langchain_core.outputs import GenerationChunk
+
+OLLAMA_HOST = os.environ.get("OLLAMA_HOST", "http://localhost:11434").rstrip("/")
+LLM_MODEL = os.environ.get("LLM_MODEL", "llama3")
+# Seconds to open a connection, and to wait for the next piece of a response
+LLM_CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", "3"))
+LLM_READ_TIMEOUT = float(os.environ.get("LLM_READ_TIMEOUT", "120"))
+# Extra attempts after a connection error, timeout or 5xx (never once tokens have arrived)
+LLM_RETRIES = int(os.environ.get("LLM_RETRIES", "2"))
+LLM_RETRY_BACKOFF = float(os.environ.get("LLM_RETRY_BACKOFF", "0.5"))
+# Keep-alive connections held open to Ollama
+LLM_POOL_SIZE = int(os.environ.get("LLM_POOL_SIZE", "8"))
+# How long Ollama keeps the model loaded after a request, e.g. "30m"; empty = Ollama's default
+LLM_KEEP_ALIVE = os.environ.get("LLM_KEEP_ALIVE", "")
+
+
+class LLMError(RuntimeError):
+    """Ollama could not produce an answer (after retries)"""
+
+
+class _Flight:
+    """One generation in progress; every caller with the same prompt reads its tokens"""
+
+    def __init__(self):
+        self.tokens = []
+        self.done = False
+        self.error = None
+        self.followers = 0
+        self.condition = threading.Condition()
+
+    def add(self, token):
+        with self.condition:
+            self.tokens.append(token)
+            self.condition.notify_all()
+
+    def finish(self, error=None):
+        with self.condition:
+            self.done = True
+            self.error = error
+            self.condition.notify_all()
+
+    def follow(self):
+        """Yield every token from the start, waiting for new ones until the leader finishes"""
+        position = 0
+        while True:
+            with self.condition:
+                while position == len(self.tokens) and not self.done:
+                    self.condition.wait()
+                pending = self.tokens[position:]
+                position = len(self.tokens)
+                done, error = self.done, self.error
+            yield from pending
+            if done and position == len(self.tokens):
+                if error is not None:
+                    raise error
+                return
+
+
+class OllamaClient:
+    """Pooled, coalescing client for Ollama's /api/generate"""
+
+    def __init__(self, model=LLM_MODEL, base_url=OLLAMA_HOST, options=None,
+                 connect_timeout=LLM_CONNECT_TIMEOUT, read_timeout=LLM_READ_TIMEOUT,
+                 retries=LLM_RETRIES, backoff=LLM_RETRY_BACKOFF, pool_size=LLM_POOL_SIZE,
+                 keep_alive=LLM_KEEP_ALIVE):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.options = options or {}
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.keep_alive = keep_alive
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._flights = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.coalesced = 0
+        self.retried = 0
+        self.failures = 0
+
+    def _key(self, prompt):
+        settings = json.dumps([self.model, self.options], sort_keys=True)
+        return hashlib.sha256(f"{settings}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def generate(self, prompt):
+        """The full answer for a prompt"""
+        return "".join(self.stream(prompt))
+
+    def stream(self, prompt):
+        """Yield the answer as Ollama generates it, joining an identical generation already running"""
+        key = self._key(prompt)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self.requests += 1
+            else:
+                flight.followers += 1
+                self.coalesced += 1
+        if leader:
+            yield from self._lead(key, flight, prompt)
+        else:
+            yield from flight.follow()
+
+    def _lead(self, key, flight, prompt):
+        tokens = self._generate(prompt)
+        error = None
+        try:
+            for token in tokens:
+                flight.add(token)
+                yield token
+        except GeneratorExit:
+            # Our caller stopped reading; finish the answer for anyone sharing it
+            with self._lock:
+                shared = flight.followers > 0
+                if not shared:
+                    del self._flights[key]
+            if shared:
+                try:
+                    for token in tokens:
+                        flight.add(token)
+                except Exception as e:
+                    error = e
+            raise
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            tokens.close()
+            with self._lock:
+                self._flights.pop(key, None)
+                if error is not None:
+                    self.failures += 1
+            flight.finish(error if error is None or isinstance(error, LLMError) else LLMError(str(error)))
+
+    def _generate(self, prompt):
+        """Stream tokens from Ollama, retrying until the first one arrives"""
+        import requests
+
+        payload = {"model": self.model, "prompt": prompt, "stream": True}
+        if self.options:
+            payload["options"] = self.options
+        if self.keep_alive:
+            payload["keep_alive"] = self.keep_alive
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(f"{self.base_url}/api/generate", json=payload,
+                                             stream=True, timeout=self.timeout)
+                if response.status_code >= 500 or response.status_code == 429:
+                    response.close()
+                    raise requests.HTTPError(f"Ollama returned {response.status_code}", response=response)
+                if response.status_code >= 400:
+                    detail = response.text
+                    response.close()
+                    raise LLMError(f"Ollama returned {response.status_code}: {detail}")
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                if attempt >= self.retries:
+                    raise LLMError(f"Ollama at {self.base_url} unavailable: {e}") from e
+                attempt += 1
+                self.retried += 1
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+
+        with response:
+            yield from self._tokens(response)
+
+    def _tokens(self, response):
+        import requests
+
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise LLMError(f"Ollama error: {data['error']}")
+                if data.get("response"):
+                    yield data["response"]
+                if data.get("done"):
+                    return
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise LLMError(f"Ollama connection lost mid-answer: {e}") from e
+
+    def stats(self):
+        with self._lock:
+            in_flight = len(self._flights)
+        return {
+            "model": self.model,
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "retries": self.retried,
+            "failures": self.failures,
+            "in_flight": in_flight,
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class PooledOllama(LLM):
+    """LangChain LLM over an OllamaClient, so RetrievalQA and .invoke/.stream share the pool"""
+
+    client: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "pooled-ollama"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None,
+              run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> str:
+        return self.client.generate(prompt)
+
+    def _stream(self, prompt: str, stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[GenerationChunk]:
+        for token in self.client.stream(prompt):
+            chunk = GenerationChunk(text=token)
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+RAG chat endpoints for the full-rag mode of app_factory
+/chat and /chat/stream answer through RagService on a bounded executor, with
+the FAQ engine standing in when the LLM is down or over CHAT_LATENCY_BUDGET
+"""
+
+import asyncio
+import json
+import threading
+from datetime import datetime
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from chat_executor import CHAT_LATENCY_BUDGET, ChatExecutor, ChatQueueFull
+from rag_service import RagService
+
+_STREAM_END = object()
+
+
+def chat_busy_error():
+    return HTTPException(
+        status_code=503,
+        detail="The assistant is busy right now. Please try again in a moment.",
+        headers={"Retry-After": "2"}
+    )
+
+
+def add_rag_routes(app, core):
+    """Register the RAG chat routes and lifecycle hooks; returns the RagService"""
+    from app_factory import ChatMessage
+
+    # LLM and retrieval work runs here so it never blocks the event loop
+    chat_executor = ChatExecutor()
+    # The RAG chat engine; the LangChain stack is only imported by its warm-up
+    rag = RagService(core.storage, chat_executor, core.fallback)
+    app.state.rag = rag
+
+    core.health.append(lambda: {
+        "rag_bot": "initialized" if rag.qa_chain is not None else "not_available",
+        "chat": chat_executor.stats(),
+        **rag.stats()
+    })
+
+    @app.on_event("startup")
+    def start_rag_warmup():
+        rag.warmup.start()
+
+    @app.on_event("shutdown")
+    def shutdown_chat_executor():
+        chat_executor.shutdown()
+        rag.close()
+
+    # While the chain is still being built the fallback engine answers instead
+    WARMING_UP = "The RAG bot is still starting up"
+
+    @app.get("/ready")
+    def readiness_check():
+        """Report RAG warm-up progress; 503 until the chain is built or has failed"""
+        status = rag.warmup.status()
+        if rag.warmup.is_warming or status["stage"] == "pending":
+            return JSONResponse(status_code=503, content=status)
+        return status
+
+    @app.post("/chat")
+    async def chat_with_bot(message: ChatMessage):
+        """Chat with the RAG bot"""
+        source, error = "cache", None
+        try:
+            response = rag.cached_answer(message.message, message.user_id)
+            if response is None and rag.warmup.is_warming:
+                response, source = rag.fallback_reply(message.message)
+                error = WARMING_UP
+            elif response is None:
+                response, source = await asyncio.wait_for(
+                    chat_executor.run(rag.answer_question, message.message, message.user_id, cache_checked=True),
+                    CHAT_LATENCY_BUDGET if CHAT_LATENCY_BUDGET > 0 else None
+                )
+        except ChatQueueFull:
+            raise chat_busy_error()
+        except asyncio.TimeoutError:
+            # Too slow: answer now; a generation that already started still fills the answer cache
+            response, source = rag.fallback_reply(message.message)
+            error = f"No answer from the RAG bot within {CHAT_LATENCY_BUDGET:g}s"
+        except Exception as e:
+            # LLM down or failing: a curated answer beats an apology
+            response, source = rag.fallback_reply(message.message)
+            error = str(e)
+
+        # Store chat history
+        core.record_chat(message.user_id, message.message, response)
+
+        result = {
+            "response": response,
+            "source": source,
+            "user_id": message.user_id,
+            "timestamp": str(datetime.now())
+        }
+        if error is not None:
+            result["error"] = error
+        return result
+
+    @app.post("/chat/stream")
+    async def chat_stream(message: ChatMessage):
+        """Chat with the RAG bot, streaming the answer as NDJSON token events"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        cancelled = threading.Event()
+
+        def emit(token):
+            loop.call_soon_threadsafe(queue.put_nowait, token)
+
+        future = None
+        warming = False
+        cached = rag.cached_answer(message.message, message.user_id)
+        if cached is not None:
+            queue.put_nowait(cached)
+            queue.put_nowait(_STREAM_END)
+        elif rag.warmup.is_warming:
+            # Nothing to stream yet; the done event below carries the fallback answer
+            warming = True
+            queue.put_nowait(_STREAM_END)
+        else:
+            try:
+                future = chat_executor.submit(rag.produce_answer_stream, message.message, message.user_id,
+                                              emit, cancelled, cache_checked=True)
+            except ChatQueueFull:
+                raise chat_busy_error()
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(queue.put_nowait, _STREAM_END))
+
+        async def events():
+            pieces = []
+            source, error = "cache", WARMING_UP if warming else None
+            first_token_budget = CHAT_LATENCY_BUDGET if CHAT_LATENCY_BUDGET > 0 else None
+            try:
+                while True:
+                    try:
+                        item = await asyncio.wait_for(queue.get(), None if pieces else first_token_budget)
+                    except asyncio.TimeoutError:
+                        # Nothing generated within the budget; the finally below stops the generation
+                        error = f"No answer from the RAG bot within {CHAT_LATENCY_BUDGET:g}s"
+                        break
+                    if item is _STREAM_END:
+                        break
+                    pieces.append(item)
+                    yield json.dumps({"type": "token", "token": item}) + "\n"
+
+                if error is None and future is not None:
+                    if future.cancelled() or future.exception() is not None:
+                        error = "cancelled" if future.cancelled() else str(future.exception())
+                        if pieces:
+                            # Failed part way through an answer; too late to swap in another
+                            yield json.dumps({
+                                "type": "error",
+                                "response": "I'm sorry, I'm having trouble processing your request right now. Please try again later.",
+                                "error": error
+                            }) + "\n"
+                            return
+                    else:
+                        source = future.result()
+
+                if error is not None:
+                    response, source = rag.fallback_reply(message.message)
+                    yield json.dumps({"type": "token", "token": response}) + "\n"
+                else:
+                    response = "".join(pieces)
+                core.record_chat(message.user_id, message.message, response)
+                done = {
+                    "type": "done",
+                    "response": response,
+                    "source": source,
+                    "user_id": message.user_id,
+                    "timestamp": str(datetime.now())
+                }
+                if error is not None:
+                    done["error"] = error
+                yield json.dumps(done) + "\n"
+            finally:
+                cancelled.set()
+
+        return StreamingResponse(events(), media_type="application/x-ndjson")
+
+    @app.get("/chat/cache")
+    def get_chat_cache_stats():
+        """Answer cache size and hit/miss counters"""
+        return rag.answer_cache.stats()
+
+    return rag
@@ -1,33 +1,23 @@
-from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import OllamaEmbeddings
-from langchain_community.document_loaders import TextLoader
-from langchain_community.llms import Ollama
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.chains import RetrievalQA
 
-import os
-
-# Load documents from .txt file
-print("➡️ Loading: my-rag-bot/data/info.txt")
-loader = TextLoader("my-rag-bot/data/info.txt", encoding="utf-8")
-docs = loader.load()
-
-# Split into chunks
-splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-chunks = splitter.split_documents(docs)
+from index_store import EMBEDDING_MODEL
+from ingest import sync_index
+from llm_client import OLLAMA_HOST, OllamaClient, PooledOllama
+from rerank import build_retriever
 
 # Create embeddings with LLaMA 3
-embedding = OllamaEmbeddings(model="llama3")  # ✅ explicitly set model
+embedding = OllamaEmbeddings(model=EMBEDDING_MODEL, base_url=OLLAMA_HOST)  # ✅ explicitly set model
 
-# Create vector store
-print("📦 Creating FAISS vector store...")
-vectorstore = FAISS.from_documents(chunks, embedding=embedding)
+# Load the persisted vector store (built from my-rag-bot/data/ on first run)
+print("➡️ Loading vector store for: my-rag-bot/data/")
+vectorstore, manifest, _ = sync_index(embedding)
 
 # Load LLM
-llm = Ollama(model="llama3")
+llm = PooledOllama(client=OllamaClient())
 
-# Retrieval QA chain
-qa_chain = RetrievalQA.from_chain_type(llm=llm, retriever=vectorstore.as_retriever())
+# Retrieval QA chain over BM25 + FAISS, reranked and trimmed to a token budget
+qa_chain = RetrievalQA.from_chain_type(llm=llm, retriever=build_retriever(vectorstore, manifest))
 
 # Interactive Q&A
 print("\n🤖 Ask me anything (type 'exit' to quit):")
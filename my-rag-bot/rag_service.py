@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+RAG chat engine for the backend
+Owns the chain and its background warm-up, the answer cache, conversation
+memory and the deterministic fallback. Importing this module is cheap: the
+LangChain / FAISS / Ollama stack is only imported when the warm-up runs, so
+the quiz and profile API can serve before (or without) it.
+"""
+
+from answer_cache import AnswerCache
+from chat_executor import ChatQueueFull
+from conversation import ANONYMOUS_USER, ConversationMemory
+from warmup import Warmup
+
+
+class RagService:
+    """The RAG chat path, from warm-up to streamed answers"""
+
+    def __init__(self, storage, chat_executor, fallback):
+        self.chat_executor = chat_executor
+        self.fallback = fallback
+        self.answer_cache = AnswerCache()
+        # Recent turns and a rolling summary give follow-up questions their context
+        self.conversation_memory = ConversationMemory(storage)
+        self.qa_chain = None
+        # Pooled Ollama client, kept across rebuilds of the chain
+        self.llm_client = None
+        self.warmup = Warmup(self.build_chain)
+
+    def build_chain(self, report):
+        """Build RAG bot components, reporting each stage to the warm-up tracker"""
+        print("🔄 Initializing RAG bot components...")
+
+        try:
+            # Import RAG bot components
+            report("importing")
+            from langchain_community.embeddings import OllamaEmbeddings
+            from langchain.chains import RetrievalQA
+            from index_store import EMBEDDING_MODEL
+            from ingest import sync_index
+            from llm_client import OLLAMA_HOST, OllamaClient, PooledOllama
+            from rerank import build_retriever
+
+            # Create embeddings with LLaMA 3
+            embedding = OllamaEmbeddings(model=EMBEDDING_MODEL, base_url=OLLAMA_HOST)
+
+            # Open the persisted vector store, ingesting only files that changed
+            report("loading_index")
+            vectorstore, manifest, _ = sync_index(embedding)
+
+            # Cached answers are only valid for the index they were generated from
+            self.answer_cache.embed = embedding.embed_query
+            self.answer_cache.set_index_key(manifest["key"])
+
+            # Load LLM: one pooled client, identical in-flight prompts share a generation
+            report("loading_llm")
+            if self.llm_client is None:
+                self.llm_client = OllamaClient()
+            llm = PooledOllama(client=self.llm_client)
+
+            # Retrieval QA chain over BM25 + FAISS (keyword queries skip the embedder),
+            # reranked and trimmed to a token budget before it reaches the prompt
+            report("building_chain")
+            self.qa_chain = RetrievalQA.from_chain_type(llm=llm, retriever=build_retriever(vectorstore, manifest))
+
+            print("✅ RAG bot initialized successfully!")
+            return self.qa_chain
+
+        except Exception as e:
+            print(f"⚠️  RAG bot initialization failed: {e}")
+            print("💡 The app will work without the RAG bot. Chat functionality will be limited.")
+            raise
+
+    def initialize(self):
+        """Return the RAG chain, waiting for the single background build if needed"""
+        if self.qa_chain is not None:
+            return self.qa_chain
+        return self.warmup.wait()
+
+    def close(self):
+        if self.llm_client is not None:
+            self.llm_client.close()
+
+    def stats(self):
+        chain = self.qa_chain
+        return {
+            "llm": self.llm_client.stats() if self.llm_client is not None else None,
+            # Lexical fast-path, fused, reranked and rerank-skipped query counts
+            "retrieval": chain.retriever.stats() if chain is not None else None,
+            "fallback": self.fallback.stats(),
+        }
+
+    def fallback_reply(self, question):
+        """(response, source) from the deterministic FAQ/passage engine"""
+        result = self.fallback.answer(question)
+        return result["response"], result["source"]
+
+    def cached_answer(self, question, user_id):
+        """Anonymous repeated questions are answered straight from the cache; everyone
+        else may be asking a follow-up, which answer_question checks"""
+        return self.answer_cache.get(question) if user_id == ANONYMOUS_USER else None
+
+    def rag_prompt(self, chain, question, conversation):
+        """Retrieve for the question and build the LLM prompt, with conversation memory if any"""
+        from langchain_core.prompts import format_document
+
+        docs = chain.retriever.invoke(conversation.retrieval_query(question))
+        stuff = chain.combine_documents_chain
+        context = stuff.document_separator.join(format_document(d, stuff.document_prompt) for d in docs)
+        if conversation.is_empty:
+            return stuff.llm_chain.prompt.format(**{stuff.document_variable_name: context, "question": question})
+        return conversation.prompt(context, question)
+
+    def summarize_later(self, chain, conversation):
+        """Fold old turns into the rolling summary without holding up the answer"""
+        if not conversation.pending:
+            return
+        try:
+            self.chat_executor.submit(self.conversation_memory.summarize,
+                                      chain.combine_documents_chain.llm_chain.llm, conversation)
+        except ChatQueueFull:
+            # Busy - the same turns are still pending on the user's next message
+            pass
+
+    def _conversation_and_cache(self, question, user_id, cache_checked):
+        """(conversation, cached answer or None, question vector for caching the new answer)"""
+        # Cached answers only fit questions asked without earlier context
+        conversation = self.conversation_memory.load(user_id)
+        cached, vector = None, None
+        if conversation.is_empty:
+            # Don't repeat (and count twice) the exact lookup cached_answer already made
+            if not (cache_checked and user_id == ANONYMOUS_USER):
+                cached = self.answer_cache.get(question)
+            if cached is None:
+                cached, vector = self.answer_cache.get_similar(question)
+        return conversation, cached, vector
+
+    def answer_question(self, question, user_id=ANONYMOUS_USER, cache_checked=False):
+        """Answer a chat message with the RAG bot (blocking, runs on the chat executor)
+
+        Returns (response, source), where source says which path answered: "rag",
+        "cache", or the fallback engine's "faq", "passage" or "default".
+        cache_checked says cached_answer already ran for this message.
+        """
+        chain = self.qa_chain
+
+        if chain is None:
+            # Kick off another build if the last one failed a while ago
+            self.warmup.start()
+
+            # Fallback response when RAG bot is not available
+            return self.fallback_reply(question)
+
+        conversation, cached, vector = self._conversation_and_cache(question, user_id, cache_checked)
+        if cached is not None:
+            return cached, "cache"
+
+        # Get response from RAG bot
+        response = chain.combine_documents_chain.llm_chain.llm.invoke(self.rag_prompt(chain, question, conversation))
+        if conversation.is_empty:
+            self.answer_cache.put(question, response, vector)
+        self.summarize_later(chain, conversation)
+        return response, "rag"
+
+    def stream_rag_tokens(self, chain, question, conversation):
+        """Run retrieval, then yield the answer piece by piece as Ollama generates it"""
+        prompt = self.rag_prompt(chain, question, conversation)
+        for token in chain.combine_documents_chain.llm_chain.llm.stream(prompt):
+            yield token
+
+    def produce_answer_stream(self, question, user_id, emit, cancelled, cache_checked=False):
+        """Streaming counterpart of answer_question; hands each piece to emit and returns the source"""
+        chain = self.qa_chain
+
+        if chain is None:
+            self.warmup.start()
+            response, source = self.fallback_reply(question)
+            emit(response)
+            return source
+
+        conversation, cached, vector = self._conversation_and_cache(question, user_id, cache_checked)
+        if cached is not None:
+            emit(cached)
+            return "cache"
+
+        pieces = []
+        for token in self.stream_rag_tokens(chain, question, conversation):
+            if cancelled.is_set():
+                # Client went away; stop generating and don't cache a partial answer
+                return "rag"
+            pieces.append(token)
+            emit(token)
+        if conversation.is_empty:
+            self.answer_cache.put(question, "".join(pieces), vector)
+        self.summarize_later(chain, conversation)
+        return "rag"
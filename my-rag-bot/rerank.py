@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Post-retrieval stage for the RAG bot
+Over-fetches from the hybrid retriever, drops the text that neighbouring chunks
+share through CHUNK_OVERLAP, reranks what is left and trims it to a token budget
+before it is stuffed into the prompt. Reranking is skipped whenever it would
+push the request past RERANK_BUDGET_MS.
+
+RERANKER:
+    lexical        (default) query-term coverage and proximity, no model needed
+    cross-encoder  sentence-transformers CrossEncoder(RERANK_MODEL), if installed
+    none           keep retriever order; dedupe and token trimming still apply
+"""
+
+import math
+import os
+import time
+from typing import Any, List
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from conversation import count_tokens, truncate_tokens
+from index_store import CHUNK_OVERLAP, INDEX_DIR
+from lexical_index import hybrid_retriever, tokenize
+
+RERANKER = os.environ.get("RERANKER", "lexical").lower()
+RERANK_MODEL = os.environ.get("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+# Candidates fetched for reranking, and how many chunks may reach the prompt
+RERANK_FETCH_K = int(os.environ.get("RERANK_FETCH_K", "12"))
+RERANK_TOP_N = int(os.environ.get("RERANK_TOP_N", "4"))
+# Token budget for the retrieved context in the prompt
+CONTEXT_TOKENS = int(os.environ.get("CONTEXT_TOKENS", "1200"))
+# Retrieval + reranking time per request before reranking is skipped
+RERANK_BUDGET_MS = float(os.environ.get("RERANK_BUDGET_MS", "150"))
+
+# Shortest shared boundary text treated as chunk overlap rather than coincidence
+MIN_OVERLAP = 20
+
+
+def _shared_boundary(first, second):
+    """Length of the longest suffix of first that is a prefix of second (up to CHUNK_OVERLAP + slack)"""
+    longest = min(len(first), len(second), CHUNK_OVERLAP * 2)
+    for size in range(longest, MIN_OVERLAP - 1, -1):
+        if first.endswith(second[:size]):
+            return size
+    return 0
+
+
+def dedupe_overlaps(docs):
+    """Drop repeated chunks and cut the text a chunk shares with a neighbour already kept"""
+    kept, seen = [], set()
+    for doc in docs:
+        text = doc.page_content
+        if text in seen:
+            continue
+        seen.add(text)
+        source = doc.metadata.get("source")
+        for other in kept:
+            if other.metadata.get("source") != source:
+                continue
+            shared = _shared_boundary(other.page_content, text)
+            if shared:
+                text = text[shared:].lstrip()
+                continue
+            shared = _shared_boundary(text, other.page_content)
+            if shared:
+                text = text[:-shared].rstrip()
+        if text.strip():
+            kept.append(Document(page_content=text, metadata=doc.metadata))
+    return kept
+
+
+class LexicalReranker:
+    """Scores chunks by idf-weighted query-term coverage and how close together the terms occur"""
+
+    def __init__(self, idf=None):
+        self.idf = idf or {}
+
+    def score(self, query, docs):
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return [0.0] * len(docs)
+        weights = {t: self.idf.get(t, 1.0) for t in terms}
+        total = sum(weights.values())
+
+        scores = []
+        for doc in docs:
+            tokens = tokenize(doc.page_content)
+            positions = {}
+            for i, token in enumerate(tokens):
+                if token in weights:
+                    positions.setdefault(token, []).append(i)
+            coverage = sum(weights[t] for t in positions) / total
+            scores.append(coverage + 0.5 * self._proximity(positions, len(terms)))
+        return scores
+
+    @staticmethod
+    def _proximity(positions, term_count):
+        """1 when the matched terms sit next to each other, falling towards 0 as they spread out"""
+        if len(positions) < 2:
+            return 0.0
+        events = sorted((p, t) for t, ps in positions.items() for p in ps)
+        need, counts, matched, best, left = len(positions), {}, 0, math.inf, 0
+        for right, (position, term) in enumerate(events):
+            counts[term] = counts.get(term, 0) + 1
+            if counts[term] == 1:
+                matched += 1
+            while matched == need:
+                best = min(best, position - events[left][0] + 1)
+                left_term = events[left][1]
+                counts[left_term] -= 1
+                if not counts[left_term]:
+                    matched -= 1
+                left += 1
+        return need / best * (need / term_count)
+
+
+class CrossEncoderReranker:
+    def __init__(self, model_name=RERANK_MODEL):
+        from sentence_transformers import CrossEncoder
+        self.model = CrossEncoder(model_name)
+
+    def score(self, query, docs):
+        return [float(s) for s in self.model.predict([(query, d.page_content) for d in docs])]
+
+
+def make_reranker(kind=RERANKER, idf=None):
+    if kind == "none":
+        return None
+    if kind == "cross-encoder":
+        try:
+            return CrossEncoderReranker()
+        except Exception as e:
+            print(f"⚠️  Cross-encoder reranker unavailable ({e}), using the lexical reranker")
+    return LexicalReranker(idf)
+
+
+class RerankingRetriever(BaseRetriever):
+    """Wraps a retriever with dedupe, reranking under a latency budget, and context trimming"""
+
+    base: Any
+    reranker: Any = None
+    top_n: int = RERANK_TOP_N
+    context_tokens: int = CONTEXT_TOKENS
+    budget_ms: float = RERANK_BUDGET_MS
+    # Running average of reranking time, to predict whether it fits the budget
+    average_ms: float = 0.0
+    reranked: int = 0
+    skipped: int = 0
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        started = time.perf_counter()
+        docs = dedupe_overlaps(self.base.invoke(query))
+
+        if self.reranker is not None and len(docs) > 1:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms + self.average_ms <= self.budget_ms:
+                rerank_started = time.perf_counter()
+                scores = self.reranker.score(query, docs)
+                # Stable sort keeps retriever order between equal scores
+                docs = [doc for _, doc in sorted(zip(scores, docs), key=lambda pair: -pair[0])]
+                rerank_ms = (time.perf_counter() - rerank_started) * 1000
+                self.average_ms = rerank_ms if not self.reranked else 0.8 * self.average_ms + 0.2 * rerank_ms
+                self.reranked += 1
+            else:
+                self.skipped += 1
+
+        return self._trim(docs[:self.top_n])
+
+    def _trim(self, docs):
+        """Keep chunks in order until the context token budget is spent"""
+        kept, remaining = [], self.context_tokens
+        for doc in docs:
+            tokens = count_tokens(doc.page_content)
+            if tokens <= remaining:
+                kept.append(doc)
+                remaining -= tokens
+            elif not kept:
+                # Always pass on something: the best chunk, cut to fit
+                text = truncate_tokens(doc.page_content, remaining)
+                kept.append(Document(page_content=text, metadata=doc.metadata))
+                break
+        return kept
+
+    def stats(self):
+        base_stats = self.base.stats() if hasattr(self.base, "stats") else {}
+        return {
+            **base_stats,
+            "reranked": self.reranked,
+            "rerank_skipped": self.skipped,
+            "average_rerank_ms": round(self.average_ms, 2),
+        }
+
+
+def build_retriever(vectorstore, manifest, index_dir=INDEX_DIR):
+    """The full retrieval pipeline: hybrid BM25 + FAISS, then this stage"""
+    hybrid = hybrid_retriever(vectorstore, manifest, index_dir, k=RERANK_FETCH_K)
+    return RerankingRetriever(base=hybrid, reranker=make_reranker(idf=hybrid.lexical.idf))
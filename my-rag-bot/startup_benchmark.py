@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Startup time report for the backend: import cost and time to the first 200
+
+Usage:
+    python my-rag-bot/startup_benchmark.py                  # report only
+    python my-rag-bot/startup_benchmark.py --check          # exit 1 on a regression
+    python my-rag-bot/startup_benchmark.py --module main --path /quiz/questions --runs 5
+
+The import breakdown comes from `python -X importtime` in a fresh interpreter.
+Time to first 200 starts uvicorn in a subprocess and polls --path until it
+answers 200. --check fails if either exceeds its budget or if importing the
+app pulls in the RAG stack (HEAVY_MODULES), which must stay lazy.
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+
+STARTUP_IMPORT_BUDGET_MS = float(os.environ.get("STARTUP_IMPORT_BUDGET_MS", "1000"))
+STARTUP_FIRST_200_BUDGET_MS = float(os.environ.get("STARTUP_FIRST_200_BUDGET_MS", "3000"))
+
+# Only the RAG warm-up may import these
+HEAVY_MODULES = (
+    "langchain", "langchain_core", "langchain_community", "faiss", "numpy",
+    "tiktoken", "requests", "sentence_transformers", "torch", "uvicorn",
+)
+
+
+def import_breakdown(module, cwd=BASE_DIR):
+    """[(self µs, cumulative µs, depth, module name), ...] for what `import module` loads
+
+    Runs in a fresh interpreter; modules the interpreter itself loads at startup
+    (site and friends) are left out.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, capture_output=True, text=True, env=_quiet_env(),
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(own), int(cumulative), depth, name.strip()))
+
+    # -X importtime lists a module after everything it imported
+    end = next(i for i, row in enumerate(rows) if row[2] == 0 and row[3] == module)
+    start = end
+    while start > 0 and rows[start - 1][2] > 0:
+        start -= 1
+    return rows[start:end + 1]
+
+
+def _quiet_env():
+    # Keep the app off the real database and the default port's neighbours
+    env = dict(os.environ)
+    env.setdefault("STORAGE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'startup_benchmark.db')}")
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    # Top-level backends (simple_backend, simple_server) are importable too
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT_DIR, env.get("PYTHONPATH")]))
+    return env
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_200(module, path, timeout=60.0, cwd=BASE_DIR):
+    """Milliseconds from launching uvicorn to the first 200 on path"""
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{module}:app", "--port", str(port), "--log-level", "warning"],
+        cwd=cwd, env=_quiet_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise SystemExit(f"uvicorn exited with {server.returncode} before answering")
+            try:
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                connection.request("GET", path)
+                if connection.getresponse().status == 200:
+                    return (time.perf_counter() - started) * 1000
+            except OSError:
+                pass
+            time.sleep(0.01)
+        raise SystemExit(f"No 200 from {path} within {timeout:.0f}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure backend import time and time to first 200")
+    parser.add_argument("--module", default="main",
+                        help="app module: main (full-rag), simple_backend (quiz-only) or simple_server (mock)")
+    parser.add_argument("--path", default="/quiz/questions", help="endpoint that must answer 200")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=12, help="slowest imports to list")
+    parser.add_argument("--check", action="store_true", help="exit 1 when a budget is exceeded")
+    parser.add_argument("--import-budget-ms", type=float, default=STARTUP_IMPORT_BUDGET_MS)
+    parser.add_argument("--first-200-budget-ms", type=float, default=STARTUP_FIRST_200_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    runs = [import_breakdown(args.module) for _ in range(args.runs)]
+    totals = [rows[-1][1] / 1000 for rows in runs]
+    import_ms = statistics.median(totals)
+    rows = runs[-1]
+
+    print(f"📦 import {args.module}: {import_ms:.0f} ms (median of {args.runs}, fresh interpreter each)\n")
+    print(f"{'cumulative ms':>14} {'self ms':>8}  module (imported directly by {args.module})")
+    direct = sorted((r for r in rows if r[2] == 1), key=lambda r: -r[1])
+    for own, cumulative, _, name in direct[:args.top]:
+        print(f"{cumulative / 1000:>14.1f} {own / 1000:>8.1f}  {name}")
+
+    print(f"\n{'self ms':>14}  slowest modules anywhere")
+    for own, _, _, name in sorted(rows, key=lambda r: -r[0])[:args.top]:
+        print(f"{own / 1000:>14.1f}  {name}")
+
+    loaded = {name for _, _, _, name in rows}
+    heavy = sorted(m for m in HEAVY_MODULES if m in loaded)
+
+    first_200 = statistics.median(time_to_first_200(args.module, args.path) for _ in range(args.runs))
+    print(f"\n🚀 time to first 200 on {args.path}: {first_200:.0f} ms (median of {args.runs})")
+
+    failures = []
+    if heavy:
+        failures.append(f"importing {args.module} loads {', '.join(heavy)}; keep them behind the RAG warm-up")
+    if import_ms > args.import_budget_ms:
+        failures.append(f"import took {import_ms:.0f} ms, budget {args.import_budget_ms:.0f} ms")
+    if first_200 > args.first_200_budget_ms:
+        failures.append(f"first 200 took {first_200:.0f} ms, budget {args.first_200_budget_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if not failures:
+        print("✅ Within budget")
+    return 1 if failures and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Stand-in for a local Ollama server, for running the chat path without a model
+
+Usage:
+    python my-rag-bot/stub_ollama.py --port 11435 --token-delay 0.05
+    OLLAMA_HOST=http://localhost:11435 python my-rag-bot/main.py
+
+Serves /api/generate (streamed or not) with a canned answer that quotes the
+question, /api/embeddings and /api/embed with deterministic hashed vectors,
+and /api/tags. GET /stats reports how many generations it was asked for, which
+is how coalescing shows up: N identical concurrent chats, one generation.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+EMBEDDING_DIM = 384
+
+
+def embed(text, dim=EMBEDDING_DIM):
+    """Bag-of-words vector hashed into dim buckets, so similar texts get similar vectors"""
+    vector = [0.0] * dim
+    for word in re.findall(r"\w+", text.lower()):
+        digest = hashlib.md5(word.encode("utf-8")).digest()
+        vector[int.from_bytes(digest[:4], "little") % dim] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def answer_for(prompt):
+    question = prompt.rsplit("Question:", 1)[-1].split("\n", 1)[0].strip() or "your question"
+    return f"This is a stub answer to: {question} Ask a real model for a real one."
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    token_delay = 0.0
+    fail_next = 0
+    generations = 0
+    embeddings = 0
+    lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/tags":
+            self._send_json({"models": [{"name": "llama3:latest"}, {"name": "nomic-embed-text:latest"}]})
+        elif self.path == "/stats":
+            self._send_json({"generations": StubOllama.generations, "embeddings": StubOllama.embeddings})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        request = self._read_json()
+        if self.path == "/api/generate":
+            self._generate(request)
+        elif self.path == "/api/embeddings":
+            self._count("embeddings")
+            self._send_json({"embedding": embed(request.get("prompt", ""))})
+        elif self.path == "/api/embed":
+            inputs = request.get("input", "")
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            self._count("embeddings", len(inputs))
+            self._send_json({"model": request.get("model"), "embeddings": [embed(t) for t in inputs]})
+        else:
+            self._send_json({"error": "not found"}, 404)
+
+    def _count(self, name, amount=1):
+        with StubOllama.lock:
+            setattr(StubOllama, name, getattr(StubOllama, name) + amount)
+
+    def _generate(self, request):
+        with StubOllama.lock:
+            if StubOllama.fail_next:
+                StubOllama.fail_next -= 1
+                failing = True
+            else:
+                failing = False
+                StubOllama.generations += 1
+        if failing:
+            self._send_json({"error": "stub failure"}, 503)
+            return
+
+        model = request.get("model", "llama3")
+        words = answer_for(request.get("prompt", "")).split(" ")
+        tokens = [w + " " for w in words[:-1]] + words[-1:]
+
+        if not request.get("stream", True):
+            time.sleep(self.token_delay * len(tokens))
+            self._send_json({"model": model, "response": "".join(tokens), "done": True})
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for token in tokens:
+                time.sleep(self.token_delay)
+                self._chunk({"model": model, "response": token, "done": False})
+            self._chunk({"model": model, "response": "", "done": True})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading, as a cancelled stream does
+            self.close_connection = True
+
+    def _chunk(self, data):
+        line = json.dumps(data).encode("utf-8") + b"\n"
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping pooled keep-alive connections is routine here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def serve(port=11435, token_delay=0.0, fail_next=0):
+    """Start the stub in a background thread and return the server (call .shutdown() to stop)"""
+    StubOllama.token_delay = token_delay
+    StubOllama.fail_next = fail_next
+    server = _Server(("127.0.0.1", port), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve a fake Ollama API for local testing")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed tokens")
+    parser.add_argument("--fail-next", type=int, default=0, help="answer the first N generations with a 503")
+    args = parser.parse_args(argv)
+
+    server = serve(args.port, args.token_delay, args.fail_next)
+    print(f"🧪 Stub Ollama listening on http://127.0.0.1:{args.port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
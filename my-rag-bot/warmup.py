@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Background warm-up for the RAG chain
+Builds the chain exactly once in a background thread and reports progress
+"""
+
+import os
+import threading
+import time
+
+# How long to wait after a failed warm-up before a chat request may retry it
+RAG_WARMUP_RETRY_SECONDS = float(os.environ.get("RAG_WARMUP_RETRY_SECONDS", "60"))
+
+
+class Warmup:
+    """Single-flight background builder with progress reporting"""
+
+    def __init__(self, build, retry_after=RAG_WARMUP_RETRY_SECONDS):
+        self._build = build
+        self._retry_after = retry_after
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = None
+        self.result = None
+        self.stage = "pending"
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def report(self, stage):
+        """Called by the build function as it moves through its steps"""
+        self.stage = stage
+
+    def start(self):
+        """Start the build unless one is running, finished, or failed too recently"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self.stage == "ready":
+                return
+            if self.stage == "failed" and time.time() - self.finished_at < self._retry_after:
+                return
+
+            self._done.clear()
+            self.stage = "starting"
+            self.error = None
+            self.started_at = time.time()
+            self.finished_at = None
+            self._thread = threading.Thread(target=self._run, name="rag-warmup", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        try:
+            self.result = self._build(self.report)
+            if self.result is None:
+                self.stage = "failed"
+            else:
+                self.stage = "ready"
+        except Exception as e:
+            self.error = str(e)
+            self.stage = "failed"
+        finally:
+            self.finished_at = time.time()
+            self._done.set()
+
+    @property
+    def is_ready(self):
+        return self.stage == "ready"
+
+    @property
+    def is_warming(self):
+        return self.stage not in ("pending", "ready", "failed")
+
+    def wait(self, timeout=None):
+        """Start the build if needed and block until it finishes"""
+        self.start()
+        self._done.wait(timeout)
+        return self.result
+
+    def status(self):
+        if self.started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            "stage": self.stage,
+            "ready": self.is_ready,
+            "error": self.error,
+            "elapsed_seconds": round(elapsed, 2),
+        }
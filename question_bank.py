@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Question bank with precomputed API payloads
+Questions live in quiz_questions.json. The bank is static between reloads, so
+each language's response body is serialized once and served with a strong ETag
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from array import array
+
+from fastapi import Response
+
+QUIZ_CACHE_MAX_AGE = int(os.environ.get("QUIZ_CACHE_MAX_AGE", "60"))
+QUIZ_QUESTIONS_PATH = os.environ.get(
+    "QUIZ_QUESTIONS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "quiz_questions.json")
+)
+# How often (seconds) to check the file for edits; negative disables watching
+QUIZ_RELOAD_INTERVAL = float(os.environ.get("QUIZ_RELOAD_INTERVAL", "2"))
+
+
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+# Skill and difficulty codes are stored as unsigned shorts
+MAX_GROUPS = 2 ** 16
+
+
+def _serialize(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _etag(body):
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(if_none_match, etag):
+    """Evaluate an If-None-Match header against our ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, so W/"x" matches "x"
+    return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in candidates)
+
+
+def _breakdown(correct, total):
+    return {"correct": correct, "total": total, "percentage": round((correct / total) * 100)}
+
+
+def _group_rows(names, totals, corrects, percentages, first):
+    """Turn per-submission group matrices into breakdown dicts in first-answered order"""
+    rows = []
+    for row_totals, row_corrects, row_pcts, row_first in zip(
+            totals.tolist(), corrects.tolist(), percentages.tolist(), first.tolist()):
+        codes = sorted((c for c, t in enumerate(row_totals) if t), key=row_first.__getitem__)
+        rows.append({
+            names[c]: {"correct": row_corrects[c], "total": row_totals[c], "percentage": int(row_pcts[c])}
+            for c in codes
+        })
+    return rows
+
+
+def validate_questions(questions, languages=("en", "hi")):
+    """Check the bank once at load time; raises ValueError naming the first bad question"""
+    if not isinstance(questions, list) or not questions:
+        raise ValueError("question bank must be a non-empty list")
+
+    seen_ids = set()
+    groups = {"skill": set(), "difficulty": set()}
+    for number, q in enumerate(questions, 1):
+        where = f"question #{number}"
+        if not isinstance(q, dict):
+            raise ValueError(f"{where}: must be an object")
+        missing = {"id", "question", "options", "correct", "skill", "difficulty"} - q.keys()
+        if missing:
+            raise ValueError(f"{where}: missing {', '.join(sorted(missing))}")
+
+        question_id = q["id"]
+        if not isinstance(question_id, int) or isinstance(question_id, bool):
+            raise ValueError(f"{where}: id must be an integer")
+        if question_id in seen_ids:
+            raise ValueError(f"{where}: duplicate id {question_id}")
+        seen_ids.add(question_id)
+        where = f"question {question_id}"
+
+        for field in ("skill", "difficulty"):
+            if not isinstance(q[field], str) or not q[field].strip():
+                raise ValueError(f"{where}: {field} must be a non-empty string")
+            groups[field].add(q[field])
+            if len(groups[field]) > MAX_GROUPS:
+                raise ValueError(f"{where}: more than {MAX_GROUPS} distinct {field} names")
+
+        option_counts = set()
+        for language in languages:
+            text = q["question"].get(language) if isinstance(q["question"], dict) else None
+            options = q["options"].get(language) if isinstance(q["options"], dict) else None
+            if not isinstance(text, str) or not text.strip():
+                raise ValueError(f"{where}: no '{language}' question text")
+            if not isinstance(options, list) or len(options) < 2 or not all(isinstance(o, str) for o in options):
+                raise ValueError(f"{where}: '{language}' options must be a list of at least two strings")
+            option_counts.add(len(options))
+        if len(option_counts) > 1:
+            raise ValueError(f"{where}: languages have different numbers of options")
+
+        correct = q["correct"]
+        if not isinstance(correct, int) or isinstance(correct, bool) or not 0 <= correct < option_counts.pop():
+            raise ValueError(f"{where}: correct must index one of the options")
+
+
+def load_questions(path=QUIZ_QUESTIONS_PATH, languages=("en", "hi")):
+    """Read and validate a question file ({"questions": [...]} or a bare list)"""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    questions = data.get("questions") if isinstance(data, dict) else data
+    validate_questions(questions, languages)
+    return questions
+
+
+class QuestionBank:
+    """Holds the quiz questions, a compiled scoring index and ready-to-send JSON payloads"""
+
+    def __init__(self, questions, languages=("en", "hi")):
+        self.questions = questions
+        self.languages = tuple(languages)
+        self.payloads = {}
+        self._compile()
+        self._build_payloads()
+
+    def _compile(self):
+        """Index the bank so scoring never scans it
+
+        Questions are addressed by position; correct answers, skills and
+        difficulties live in parallel arrays, with skill and difficulty names
+        replaced by small integer codes.
+        """
+        self.skills = []
+        self.difficulties = []
+        skill_codes = {}
+        difficulty_codes = {}
+
+        self.index_by_id = {}
+        self.correct = array("h")
+        self.skill_codes = array("H")
+        self.difficulty_codes = array("H")
+
+        for position, q in enumerate(self.questions):
+            self.index_by_id[q["id"]] = position
+            self.correct.append(q["correct"])
+            self.skill_codes.append(skill_codes.setdefault(q["skill"], len(skill_codes)))
+            self.difficulty_codes.append(difficulty_codes.setdefault(q["difficulty"], len(difficulty_codes)))
+
+        self.skills = list(skill_codes)
+        self.difficulties = list(difficulty_codes)
+
+    def is_correct(self, question_id, selected_answer):
+        """Whether one answer is right under this bank; None for an unknown question id"""
+        position = self.index_by_id.get(question_id)
+        return None if position is None else selected_answer == self.correct[position]
+
+    def score(self, answers):
+        """Score (question_id, selected_answer) pairs in O(answers)
+
+        Returns the same numbers submit_quiz has always reported; skills and
+        difficulties appear in the order they were first answered. Unknown
+        question ids count towards the total but not towards any breakdown.
+        """
+        index_by_id = self.index_by_id
+        correct = self.correct
+        skill_codes = self.skill_codes
+        difficulty_codes = self.difficulty_codes
+
+        skill_correct = [0] * len(self.skills)
+        skill_total = [0] * len(self.skills)
+        difficulty_correct = [0] * len(self.difficulties)
+        difficulty_total = [0] * len(self.difficulties)
+        skill_order = []
+        difficulty_order = []
+        correct_answers = 0
+        answered = 0
+
+        for question_id, selected_answer in answers:
+            answered += 1
+            position = index_by_id.get(question_id)
+            if position is None:
+                continue
+
+            is_correct = selected_answer == correct[position]
+            skill = skill_codes[position]
+            difficulty = difficulty_codes[position]
+
+            if not skill_total[skill]:
+                skill_order.append(skill)
+            if not difficulty_total[difficulty]:
+                difficulty_order.append(difficulty)
+            skill_total[skill] += 1
+            difficulty_total[difficulty] += 1
+
+            if is_correct:
+                correct_answers += 1
+                skill_correct[skill] += 1
+                difficulty_correct[difficulty] += 1
+
+        skill_analysis = {
+            self.skills[code]: _breakdown(skill_correct[code], skill_total[code]) for code in skill_order
+        }
+        difficulty_analysis = {
+            self.difficulties[code]: _breakdown(difficulty_correct[code], difficulty_total[code])
+            for code in difficulty_order
+        }
+
+        return {
+            "score": correct_answers,
+            "total": answered,
+            "percentage": round((correct_answers / answered) * 100) if answered else 0,
+            "skill_analysis": skill_analysis,
+            "difficulty_analysis": difficulty_analysis
+        }
+
+    def score_batch(self, submissions):
+        """Score many submissions at once with NumPy; results match score() exactly
+
+        submissions is a list of lists of (question_id, selected_answer). All
+        answers are flattened into one array, checked against the correct-answer
+        vector in a single comparison and summed per submission and per
+        skill/difficulty with bincount.
+        """
+        import numpy as np
+
+        count = len(submissions)
+        n_skills = len(self.skills)
+        n_difficulties = len(self.difficulties)
+
+        lengths = np.fromiter((len(s) for s in submissions), dtype=np.int64, count=count)
+        flat = [pair for answers in submissions for pair in answers]
+        owner = np.repeat(np.arange(count), lengths)
+        # id -> position through the same dict as score() (-1 for unknown ids), so
+        # any integer id works, however large or sparse
+        index_by_id = self.index_by_id
+        positions = np.fromiter((index_by_id.get(q, -1) for q, _ in flat), dtype=np.int64, count=len(flat))
+        # Choices beyond int64 (pydantic accepts any int) can't be correct; -1 never is
+        selected = np.fromiter(
+            (a if _INT64_MIN <= a <= _INT64_MAX else -1 for _, a in flat), dtype=np.int64, count=len(flat)
+        )
+        known = positions >= 0
+
+        owner = owner[known]
+        positions = positions[known]
+        order = np.flatnonzero(known)
+        is_correct = selected[known] == np.asarray(self.correct, dtype=np.int64)[positions]
+
+        scores = np.bincount(owner, weights=is_correct, minlength=count).astype(np.int64)
+
+        def grouped(codes, groups):
+            keys = owner * groups + np.asarray(codes, dtype=np.int64)[positions]
+            totals = np.bincount(keys, minlength=count * groups).reshape(count, groups)
+            corrects = np.bincount(keys, weights=is_correct, minlength=count * groups)
+            corrects = corrects.astype(np.int64).reshape(count, groups)
+            # First answer index per group keeps the first-answered key order of score()
+            first = np.full(count * groups, len(flat), dtype=np.int64)
+            np.minimum.at(first, keys, order)
+            return totals, corrects, first.reshape(count, groups)
+
+        skill_totals, skill_corrects, skill_first = grouped(self.skill_codes, n_skills)
+        diff_totals, diff_corrects, diff_first = grouped(self.difficulty_codes, n_difficulties)
+
+        # Percentages in one pass too (np.rint rounds half to even, like round())
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percentages = np.rint(scores / lengths * 100)
+            skill_pcts = np.rint(skill_corrects / skill_totals * 100)
+            diff_pcts = np.rint(diff_corrects / diff_totals * 100)
+
+        # Only dict assembly is left; do it on plain lists rather than NumPy scalars
+        skill_rows = _group_rows(self.skills, skill_totals, skill_corrects, skill_pcts, skill_first)
+        diff_rows = _group_rows(self.difficulties, diff_totals, diff_corrects, diff_pcts, diff_first)
+        percentages = np.where(lengths > 0, percentages, 0).astype(np.int64).tolist()
+
+        return [
+            {
+                "score": score,
+                "total": answered,
+                "percentage": percentage,
+                "skill_analysis": skill_analysis,
+                "difficulty_analysis": difficulty_analysis
+            }
+            for score, answered, percentage, skill_analysis, difficulty_analysis
+            in zip(scores.tolist(), lengths.tolist(), percentages, skill_rows, diff_rows)
+        ]
+
+    def _build_payloads(self):
+        payloads = {}
+        self.localized = {}
+
+        body = _serialize({"questions": self.questions, "total": len(self.questions)})
+        payloads[None] = (body, _etag(body))
+
+        for language in self.languages:
+            questions = [
+                {
+                    "id": q["id"],
+                    "question": q["question"][language],
+                    "options": q["options"][language],
+                    "skill": q["skill"],
+                    "difficulty": q["difficulty"]
+                }
+                for q in self.questions
+            ]
+            self.localized[language] = questions
+            body = _serialize({"questions": questions, "total": len(questions)})
+            payloads[language] = (body, _etag(body))
+
+        self.payloads = payloads
+
+    def response(self, language=None, if_none_match=None):
+        """Serve the payload for a language (None for all languages), or 304 if unchanged"""
+        body, etag = self.payloads[language]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={QUIZ_CACHE_MAX_AGE}, must-revalidate",
+        }
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+class QuestionBankFile:
+    """Keeps a compiled QuestionBank in sync with its JSON file
+
+    get() re-checks the file's mtime and size at most every interval seconds.
+    When it changed, a new bank is loaded, validated and compiled off to the
+    side, then swapped in with a single assignment; requests already holding
+    the old bank finish with it. Its payloads, ETags and lookup tables go away
+    with it. A file that fails validation is reported and the current bank
+    keeps serving.
+    """
+
+    def __init__(self, path=QUIZ_QUESTIONS_PATH, languages=("en", "hi"), interval=QUIZ_RELOAD_INTERVAL):
+        self.path = path
+        self.languages = tuple(languages)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._checked_at = time.monotonic()
+        self._signature = self._file_signature()
+        self.bank = QuestionBank(load_questions(path, self.languages), self.languages)
+        self.loaded_at = time.time()
+        self.error = None
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        """Return the current bank, picking up file edits first"""
+        if self.interval >= 0 and time.monotonic() - self._checked_at >= self.interval:
+            self.reload(force=False)
+        return self.bank
+
+    def reload(self, force=True):
+        """Recompile the bank if the file changed (always with force); True if it was swapped
+
+        Forced reloads raise ValueError/OSError for a bad file so the caller can
+        report it; background checks only log it.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                signature = self._file_signature()
+                if not force and signature == self._signature:
+                    return False
+                # Remember the signature even if loading fails, so a broken file is reported once
+                self._signature = signature
+                bank = QuestionBank(load_questions(self.path, self.languages), self.languages)
+            except (OSError, ValueError) as e:
+                self.error = str(e)
+                print(f"⚠️  Question bank not reloaded, keeping the current one: {e}")
+                if force:
+                    raise
+                return False
+
+            self.bank = bank
+            self.loaded_at = time.time()
+            self.error = None
+            print(f"🔄 Question bank reloaded: {len(bank.questions)} questions from {self.path}")
+            return True
+
+    def status(self):
+        return {
+            "path": self.path,
+            "questions": len(self.bank.questions),
+            "etag": self.bank.payloads[None][1],
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+        }
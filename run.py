@@ -55,27 +55,52 @@ class DigitalSkillsApp:
                 "--port", str(self.backend_port)
             ], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
             
-            # Wait for server to start
-            time.sleep(3)
-            
-            # Test if server is running
-            import urllib.request
-            try:
-                with urllib.request.urlopen(f"http://localhost:{self.backend_port}/health", timeout=5) as response:
-                    if response.getcode() == 200:
-                        print("✅ Backend server started successfully!")
-                        return True
-                    else:
-                        print(f"❌ Backend server responded with status {response.getcode()}")
-                        return False
-            except Exception as e:
-                print(f"❌ Backend server not responding: {e}")
-                return False
+            # Wait for the RAG warm-up to report ready
+            return self.wait_for_backend_ready()
                 
         except Exception as e:
             print(f"❌ Error starting backend: {e}")
             return False
             
+    def wait_for_backend_ready(self, timeout=180, interval=0.5):
+        """Poll /ready until the backend has finished warming up"""
+        import json
+        import urllib.error
+        import urllib.request
+
+        url = f"http://localhost:{self.backend_port}/ready"
+        deadline = time.time() + timeout
+        last_stage = None
+
+        while time.time() < deadline:
+            if self.backend_process.poll() is not None:
+                print(f"❌ Backend server exited with code {self.backend_process.returncode}")
+                return False
+
+            try:
+                with urllib.request.urlopen(url, timeout=5) as response:
+                    status = json.loads(response.read())
+                    if status.get("ready"):
+                        print("✅ Backend server started successfully!")
+                    else:
+                        print(f"✅ Backend server started (RAG bot unavailable: {status.get('error')})")
+                    return True
+            except urllib.error.HTTPError as e:
+                # 503 while the RAG chain is still warming up
+                status = json.loads(e.read() or b"{}")
+                stage = status.get("stage")
+                if stage != last_stage:
+                    print(f"⏳ Warming up RAG bot: {stage}...")
+                    last_stage = stage
+            except Exception:
+                # Server not accepting connections yet
+                pass
+
+            time.sleep(interval)
+
+        print(f"❌ Backend server not ready after {timeout}s")
+        return False
+
     def start_frontend(self):
         """Start the frontend HTTP server"""
         print(f"\n🌐 Starting frontend server on port {self.frontend_port}...")
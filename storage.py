@@ -0,0 +1,668 @@
+#!/usr/bin/env python3
+"""
+Storage layer for profiles, quiz results and chat history
+SQLite (WAL mode) by default so several uvicorn workers can share one data store
+
+Select the backend with STORAGE_URL:
+    sqlite:///path/to/file.db   (default: sqlite:///digital_skills.db next to this file)
+    memory://                   (process-local dicts, lost on restart)
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STORAGE_URL = f"sqlite:///{os.path.join(BASE_DIR, 'digital_skills.db')}"
+STORAGE_URL = os.environ.get("STORAGE_URL", DEFAULT_STORAGE_URL)
+STORAGE_POOL_SIZE = int(os.environ.get("STORAGE_POOL_SIZE", "4"))
+# Chat messages are buffered and written in one transaction per batch
+STORAGE_BATCH_SIZE = int(os.environ.get("STORAGE_BATCH_SIZE", "64"))
+STORAGE_FLUSH_INTERVAL = float(os.environ.get("STORAGE_FLUSH_INTERVAL", "0.2"))
+# Newest chat messages kept in memory per user, and for how many users; each read
+# still checks SQLite for rows newer than the buffer, which other workers may have written
+CHAT_TAIL_SIZE = int(os.environ.get("CHAT_TAIL_SIZE", "50"))
+CHAT_TAIL_USERS = int(os.environ.get("CHAT_TAIL_USERS", "1024"))
+# Default and largest page size for /chat/history
+CHAT_PAGE_SIZE = int(os.environ.get("CHAT_PAGE_SIZE", "50"))
+CHAT_PAGE_MAX = int(os.environ.get("CHAT_PAGE_MAX", "500"))
+
+
+_MAX_ID = 2 ** 63 - 1
+
+
+def chat_cursor(entry):
+    """/chat/history cursor for an entry: its timestamp and id, so equal timestamps aren't skipped"""
+    return f"{entry['timestamp']}|{entry['id']}"
+
+
+def _cursor_key(cursor, after):
+    """(timestamp, id) bound for a cursor; a bare timestamp bounds on the timestamp alone"""
+    timestamp, sep, row_id = cursor.rpartition("|")
+    if sep and row_id.isdigit():
+        return timestamp, int(row_id)
+    return cursor, _MAX_ID if after else -1
+
+
+def _chat_key(entry):
+    # Chat is ordered by timestamp; imported messages can be older than ones already stored
+    return entry["timestamp"], entry["id"]
+
+
+def _chat_entry(row):
+    return {"id": row[0], "user_message": row[1], "bot_response": row[2], "timestamp": row[3]}
+
+
+def _page(entries, limit, before=None, after=None):
+    """Cut one page out of a user's chat entries (in insertion order); returns (page, has_more)"""
+    entries = sorted(({"id": i, **e} for i, e in enumerate(entries)), key=_chat_key)
+    if after is not None:
+        bound = _cursor_key(after, after=True)
+        selected = [e for e in entries if _chat_key(e) > bound]
+        return selected[:limit], len(selected) > limit
+    if before is not None:
+        bound = _cursor_key(before, after=False)
+        entries = [e for e in entries if _chat_key(e) < bound]
+    return entries[-limit:] if limit else [], len(entries) > limit
+
+
+class Storage:
+    """Interface shared by every storage backend"""
+
+    def save_profile(self, user_id, profile):
+        raise NotImplementedError
+
+    def get_profile(self, user_id):
+        raise NotImplementedError
+
+    def has_profile(self, user_id):
+        return self.get_profile(user_id) is not None
+
+    def existing_profiles(self, user_ids):
+        """Return the subset of user_ids that have a stored profile"""
+        return {user_id for user_id in set(user_ids) if self.has_profile(user_id)}
+
+    def save_quiz_result(self, user_id, result, counters=None):
+        """Upsert a user's result. counters(previous) returns {name: delta} for the
+        quiz counters, applied atomically with the write; without it the counters
+        are dropped, since they no longer match the stored results"""
+        raise NotImplementedError
+
+    def get_quiz_result(self, user_id):
+        raise NotImplementedError
+
+    def append_chat(self, user_id, entry):
+        raise NotImplementedError
+
+    def get_chat_history(self, user_id):
+        raise NotImplementedError
+
+    def get_chat_page(self, user_id, limit, before=None, after=None):
+        """One page of a user's chat, oldest message first; returns (entries, has_more)
+
+        Messages are ordered by (timestamp, id) and each entry carries its id.
+        Without a cursor this is the newest `limit` messages. `before` pages back
+        from a chat_cursor() and `after` pages forward from one.
+        """
+        return _page(self.get_chat_history(user_id), limit, before, after)
+
+    def iter_chat_history(self, user_id):
+        """Yield a user's chat entries oldest first (used by the NDJSON export)"""
+        return iter(self.get_chat_history(user_id))
+
+    # Bulk operations used by bulk_io.py; backends override them with faster paths
+
+    def save_profiles_many(self, items):
+        """Upsert (user_id, profile) pairs; the last record for a user_id wins"""
+        for user_id, profile in items:
+            self.save_profile(user_id, profile)
+
+    def save_quiz_results_many(self, items, counters=None):
+        """Upsert (user_id, result) pairs in order; counters(previous, result) as in save_quiz_result"""
+        for user_id, result in items:
+            if counters is None:
+                self.save_quiz_result(user_id, result)
+            else:
+                self.save_quiz_result(user_id, result, lambda previous: counters(previous, result))
+
+    def append_chat_many(self, items):
+        for user_id, entry in items:
+            self.append_chat(user_id, entry)
+
+    def iter_profiles(self):
+        """Yield (user_id, profile) for every stored profile"""
+        raise NotImplementedError
+
+    def iter_quiz_results(self):
+        raise NotImplementedError
+
+    def iter_chat_messages(self):
+        """Yield (user_id, entry) for every chat message in insertion order"""
+        raise NotImplementedError
+
+    # Quiz counters: named running totals over the stored results, shared by every worker
+
+    def get_counters(self):
+        """Return {name: value}; empty until the counters have been (re)built"""
+        raise NotImplementedError
+
+    def rebuild_counters(self, compute, if_missing=False):
+        """Replace the counters with compute(iter of (user_id, result)) while holding
+        off other writers. With if_missing, do nothing (and return None) when they
+        already exist, so only one worker rebuilds."""
+        raise NotImplementedError
+
+    # Small named values shared by every worker (e.g. which import files are loaded)
+
+    def get_meta(self, name):
+        raise NotImplementedError
+
+    def compare_and_set_meta(self, name, expected, value):
+        """Set name to value (None deletes it) only if it currently holds expected
+        (None = absent); returns whether it did, so one worker wins a race"""
+        raise NotImplementedError
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class MemoryStorage(Storage):
+    """Process-local dicts; the original behaviour, handy for tests and demos"""
+
+    def __init__(self):
+        self.user_profiles = {}
+        self.quiz_results = {}
+        self.chat_history = {}
+        self.counters = {}
+        self.meta = {}
+        self._lock = threading.Lock()
+
+    def save_profile(self, user_id, profile):
+        self.user_profiles[user_id] = profile
+
+    def get_profile(self, user_id):
+        return self.user_profiles.get(user_id)
+
+    def existing_profiles(self, user_ids):
+        return set(user_ids) & self.user_profiles.keys()
+
+    def save_quiz_result(self, user_id, result, counters=None):
+        with self._lock:
+            if counters is None:
+                self.counters.clear()
+            else:
+                _add_counters(self.counters, counters(self.quiz_results.get(user_id)).items())
+            self.quiz_results[user_id] = result
+
+    def get_quiz_result(self, user_id):
+        return self.quiz_results.get(user_id)
+
+    def append_chat(self, user_id, entry):
+        with self._lock:
+            self.chat_history.setdefault(user_id, []).append(entry)
+
+    def get_chat_history(self, user_id):
+        return sorted(self.chat_history.get(user_id, []), key=lambda e: e["timestamp"])
+
+    def get_chat_page(self, user_id, limit, before=None, after=None):
+        # Ids are positions in insertion order, so cursors stay valid as messages arrive
+        return _page(list(self.chat_history.get(user_id, [])), limit, before, after)
+
+    def iter_profiles(self):
+        return iter(list(self.user_profiles.items()))
+
+    def iter_quiz_results(self):
+        return iter(list(self.quiz_results.items()))
+
+    def iter_chat_messages(self):
+        for user_id, entries in list(self.chat_history.items()):
+            for entry in entries:
+                yield user_id, entry
+
+    def get_counters(self):
+        with self._lock:
+            return dict(self.counters)
+
+    def rebuild_counters(self, compute, if_missing=False):
+        with self._lock:
+            if if_missing and self.counters:
+                return None
+            self.counters = dict(compute(iter(list(self.quiz_results.items()))))
+            return dict(self.counters)
+
+    def get_meta(self, name):
+        return self.meta.get(name)
+
+    def compare_and_set_meta(self, name, expected, value):
+        with self._lock:
+            if self.meta.get(name) != expected:
+                return False
+            if value is None:
+                self.meta.pop(name, None)
+            else:
+                self.meta[name] = value
+            return True
+
+
+def _add_counters(counters, deltas):
+    for name, delta in deltas:
+        counters[name] = counters.get(name, 0) + delta
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quiz_results (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chat_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    user_message TEXT NOT NULL,
+    bot_response TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_chat_messages_user ON chat_messages (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_chat_messages_user_time ON chat_messages (user_id, timestamp, id);
+CREATE TABLE IF NOT EXISTS quiz_counters (
+    name TEXT PRIMARY KEY,
+    value NUMERIC NOT NULL
+);
+CREATE TABLE IF NOT EXISTS storage_meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class _ChatTail:
+    """Bounded ring buffer of a user's newest chat messages; older ones live only in SQLite"""
+
+    def __init__(self, rows, complete, last_id):
+        self.entries = deque((_chat_entry(row) for row in rows), maxlen=CHAT_TAIL_SIZE)
+        # Highest row id accounted for; rows above it were written since
+        self.last_id = last_id
+        # True while the buffer holds the user's entire history
+        self.complete = complete
+
+    def extend(self, rows):
+        """Append (id, user_message, bot_response, timestamp) rows above last_id, in id order.
+        Returns False if one sorts before the newest entry, so the tail must be reloaded."""
+        for row in rows:
+            if row[0] <= self.last_id:
+                continue
+            entry = _chat_entry(row)
+            if self.entries and _chat_key(entry) < _chat_key(self.entries[-1]):
+                return False
+            if len(self.entries) == self.entries.maxlen:
+                self.complete = False
+            self.entries.append(entry)
+            self.last_id = row[0]
+        return True
+
+    def page(self, limit):
+        """Newest page as (entries, has_more), or None if the buffer can't answer it"""
+        entries = list(self.entries)
+        if limit < len(entries):
+            return entries[-limit:], True
+        if self.complete:
+            return entries, False
+        return None
+
+
+class SQLiteStorage(Storage):
+    """Embedded SQLite store with a small connection pool and batched chat writes"""
+
+    def __init__(self, path, pool_size=STORAGE_POOL_SIZE, batch_size=STORAGE_BATCH_SIZE,
+                 flush_interval=STORAGE_FLUSH_INTERVAL):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        # user_id -> _ChatTail, least recently used first
+        self._tails = OrderedDict()
+        self._tail_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name="storage-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def _transaction(self):
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _query_one(self, sql, params):
+        with self._connection() as conn:
+            return conn.execute(sql, params).fetchone()
+
+    # Profiles and quiz results are written through immediately, so another
+    # worker can read them on the very next request
+
+    def save_profile(self, user_id, profile):
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO profiles (user_id, data) VALUES (?, ?)",
+                (user_id, json.dumps(profile, ensure_ascii=False))
+            )
+
+    def get_profile(self, user_id):
+        row = self._query_one("SELECT data FROM profiles WHERE user_id = ?", (user_id,))
+        return json.loads(row[0]) if row else None
+
+    def has_profile(self, user_id):
+        return self._query_one("SELECT 1 FROM profiles WHERE user_id = ?", (user_id,)) is not None
+
+    def _select_in(self, sql, user_ids):
+        """Run sql (with an IN ({}) placeholder) over user_ids in chunks, yielding rows"""
+        user_ids = list(set(user_ids))
+        with self._connection() as conn:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(user_ids), 500):
+                chunk = user_ids[start:start + 500]
+                yield from conn.execute(sql.format(",".join("?" * len(chunk))), chunk).fetchall()
+
+    def existing_profiles(self, user_ids):
+        return {row[0] for row in self._select_in("SELECT user_id FROM profiles WHERE user_id IN ({})", user_ids)}
+
+    def save_quiz_result(self, user_id, result, counters=None):
+        many = None if counters is None else (lambda previous, _: counters(previous))
+        self.save_quiz_results_many([(user_id, result)], many)
+
+    def get_quiz_result(self, user_id):
+        row = self._query_one("SELECT data FROM quiz_results WHERE user_id = ?", (user_id,))
+        return json.loads(row[0]) if row else None
+
+    def save_profiles_many(self, items):
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO profiles (user_id, data) VALUES (?, ?)",
+                ((user_id, json.dumps(profile, ensure_ascii=False)) for user_id, profile in items)
+            )
+
+    def save_quiz_results_many(self, items, counters=None):
+        items = list(items)
+        with self._transaction() as conn:
+            if counters is None:
+                conn.execute("DELETE FROM quiz_counters")
+            else:
+                # Previous results are read under the write lock, so no other worker's
+                # retake can slip in between and be counted twice or not at all
+                previous = {}
+                user_ids = list({user_id for user_id, _ in items})
+                for start in range(0, len(user_ids), 500):
+                    chunk = user_ids[start:start + 500]
+                    rows = conn.execute(
+                        "SELECT user_id, data FROM quiz_results WHERE user_id IN ({})".format(",".join("?" * len(chunk))),
+                        chunk
+                    )
+                    previous.update((user_id, json.loads(data)) for user_id, data in rows)
+                totals = {}
+                for user_id, result in items:
+                    _add_counters(totals, counters(previous.get(user_id), result).items())
+                    previous[user_id] = result
+                conn.executemany(
+                    "INSERT INTO quiz_counters (name, value) VALUES (?, ?) "
+                    "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                    totals.items()
+                )
+            conn.executemany(
+                "INSERT OR REPLACE INTO quiz_results (user_id, data) VALUES (?, ?)",
+                ((user_id, json.dumps(result, ensure_ascii=False)) for user_id, result in items)
+            )
+
+    def append_chat_many(self, items):
+        self.flush()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO chat_messages (user_id, user_message, bot_response, timestamp) "
+                "VALUES (?, ?, ?, ?)",
+                ((user_id, e["user_message"], e["bot_response"], e["timestamp"]) for user_id, e in items)
+            )
+
+    def _iter_rows(self, sql, params=()):
+        # A dedicated connection, so a long export doesn't hold a pooled one
+        conn = self._connect()
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(1000)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def iter_profiles(self):
+        for user_id, data in self._iter_rows("SELECT user_id, data FROM profiles ORDER BY user_id"):
+            yield user_id, json.loads(data)
+
+    def iter_quiz_results(self):
+        for user_id, data in self._iter_rows("SELECT user_id, data FROM quiz_results ORDER BY user_id"):
+            yield user_id, json.loads(data)
+
+    def get_counters(self):
+        with self._connection() as conn:
+            return dict(conn.execute("SELECT name, value FROM quiz_counters").fetchall())
+
+    def rebuild_counters(self, compute, if_missing=False):
+        with self._transaction() as conn:
+            if if_missing and conn.execute("SELECT 1 FROM quiz_counters LIMIT 1").fetchone():
+                return None
+            # iter_quiz_results reads on its own connection; the write lock held
+            # here keeps other workers' results out until the new counters land
+            counters = dict(compute(self.iter_quiz_results()))
+            conn.execute("DELETE FROM quiz_counters")
+            conn.executemany("INSERT INTO quiz_counters (name, value) VALUES (?, ?)", counters.items())
+        return counters
+
+    def get_meta(self, name):
+        row = self._query_one("SELECT value FROM storage_meta WHERE name = ?", (name,))
+        return row[0] if row else None
+
+    def compare_and_set_meta(self, name, expected, value):
+        with self._transaction() as conn:
+            row = conn.execute("SELECT value FROM storage_meta WHERE name = ?", (name,)).fetchone()
+            if (row[0] if row else None) != expected:
+                return False
+            if value is None:
+                conn.execute("DELETE FROM storage_meta WHERE name = ?", (name,))
+            else:
+                conn.execute("INSERT OR REPLACE INTO storage_meta (name, value) VALUES (?, ?)", (name, value))
+        return True
+
+    def iter_chat_messages(self):
+        self.flush()
+        rows = self._iter_rows(
+            "SELECT user_id, user_message, bot_response, timestamp FROM chat_messages ORDER BY id"
+        )
+        for user_id, user_message, bot_response, timestamp in rows:
+            yield user_id, {"user_message": user_message, "bot_response": bot_response, "timestamp": timestamp}
+
+    # Chat messages are buffered and flushed in batches by a background writer
+
+    def append_chat(self, user_id, entry):
+        with self._pending_lock:
+            self._pending.append((user_id, entry["user_message"], entry["bot_response"], entry["timestamp"]))
+            full = len(self._pending) >= self._batch_size
+        if full:
+            self._wakeup.set()
+
+    def get_chat_history(self, user_id):
+        # Read-your-writes: make sure this process's buffered messages are visible
+        self.flush()
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT user_message, bot_response, timestamp FROM chat_messages "
+                "WHERE user_id = ? ORDER BY timestamp, id",
+                (user_id,)
+            ).fetchall()
+        return [{"user_message": r[0], "bot_response": r[1], "timestamp": r[2]} for r in rows]
+
+    def get_chat_page(self, user_id, limit, before=None, after=None):
+        if before is None and after is None and CHAT_TAIL_SIZE:
+            # The newest page usually comes from the in-memory tail, after checking for newer rows
+            page = self._chat_tail(user_id).page(limit)
+            if page is not None:
+                return page
+
+        self.flush()
+        columns = "SELECT id, user_message, bot_response, timestamp FROM chat_messages "
+        if after is not None:
+            sql = columns + "WHERE user_id = ? AND (timestamp, id) > (?, ?) ORDER BY timestamp, id LIMIT ?"
+            params = (user_id, *_cursor_key(after, after=True), limit + 1)
+        elif before is not None:
+            sql = columns + "WHERE user_id = ? AND (timestamp, id) < (?, ?) ORDER BY timestamp DESC, id DESC LIMIT ?"
+            params = (user_id, *_cursor_key(before, after=False), limit + 1)
+        else:
+            sql = columns + "WHERE user_id = ? ORDER BY timestamp DESC, id DESC LIMIT ?"
+            params = (user_id, limit + 1)
+
+        with self._connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if after is None:
+            rows.reverse()
+        return [_chat_entry(r) for r in rows], has_more
+
+    def _chat_tail(self, user_id):
+        """The user's tail, caught up with SQLite; rows written by this or any other
+        worker since the last read are fetched by id on the (user_id, id) index"""
+        # Read-your-writes: this process's buffered messages must be in SQLite first
+        self.flush()
+        with self._tail_lock:
+            tail = self._tails.get(user_id)
+
+        if tail is not None:
+            # Usually an empty index range
+            with self._connection() as conn:
+                rows = conn.execute(
+                    "SELECT id, user_message, bot_response, timestamp FROM chat_messages "
+                    "WHERE user_id = ? AND id > ? ORDER BY id LIMIT ?",
+                    (user_id, tail.last_id, CHAT_TAIL_SIZE + 1)
+                ).fetchall()
+            with self._tail_lock:
+                # Another thread may have caught this tail up already; extend skips what it has
+                if len(rows) <= CHAT_TAIL_SIZE and tail.extend(rows):
+                    return self._keep_tail(user_id, tail)
+
+        # No tail yet, more new rows than it holds, or new rows older than its
+        # newest message (an import): load the newest rows by timestamp
+        with self._connection() as conn:
+            last_id = conn.execute("SELECT MAX(id) FROM chat_messages WHERE user_id = ?", (user_id,)).fetchone()[0] or 0
+            # Bounded by last_id, so rows written meanwhile are left to the next catch-up
+            rows = conn.execute(
+                "SELECT id, user_message, bot_response, timestamp FROM chat_messages "
+                "WHERE user_id = ? AND id <= ? ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (user_id, last_id, CHAT_TAIL_SIZE + 1)
+            ).fetchall()
+        rows.reverse()
+        tail = _ChatTail(rows[-CHAT_TAIL_SIZE:], complete=len(rows) <= CHAT_TAIL_SIZE, last_id=last_id)
+        with self._tail_lock:
+            return self._keep_tail(user_id, tail)
+
+    def _keep_tail(self, user_id, tail):
+        # Called with _tail_lock held
+        self._tails[user_id] = tail
+        self._tails.move_to_end(user_id)
+        while len(self._tails) > CHAT_TAIL_USERS:
+            self._tails.popitem(last=False)
+        return tail
+
+    def iter_chat_history(self, user_id):
+        self.flush()
+        rows = self._iter_rows(
+            "SELECT user_message, bot_response, timestamp FROM chat_messages WHERE user_id = ? ORDER BY timestamp, id",
+            (user_id,)
+        )
+        for user_message, bot_response, timestamp in rows:
+            yield {"user_message": user_message, "bot_response": bot_response, "timestamp": timestamp}
+
+    def flush(self):
+        with self._flush_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return
+            try:
+                with self._transaction() as conn:
+                    conn.executemany(
+                        "INSERT INTO chat_messages (user_id, user_message, bot_response, timestamp) "
+                        "VALUES (?, ?, ?, ?)",
+                        batch
+                    )
+            except sqlite3.Error:
+                # Keep the messages for the next flush rather than dropping them
+                with self._pending_lock:
+                    self._pending[:0] = batch
+                raise
+
+    def _write_loop(self):
+        while not self._closed:
+            self._wakeup.wait(self._flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"⚠️  Storage flush failed: {e}")
+
+    def close(self):
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join(timeout=5)
+        self.flush()
+        while not self._pool.empty():
+            self._pool.get().close()
+
+
+def create_storage(url=None):
+    """Build the storage backend named by url (defaults to STORAGE_URL)"""
+    url = url or STORAGE_URL
+    if url.startswith("memory://"):
+        return MemoryStorage()
+    if url.startswith("sqlite:///"):
+        return SQLiteStorage(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported STORAGE_URL: {url}")
@@ -87,21 +87,54 @@ async function submitQuizResults() {
     }
 }
 
-async function chatWithBot(message) {
-    try {
-        const response = await fetch(`${API_BASE_URL}/chat`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify({
-                message: message,
-                user_id: currentUserId || 'anonymous'
-            })
-        });
-        
+// Read an NDJSON stream from /chat/stream, calling onToken for each piece
+async function streamChat(message, onToken) {
+    const response = await fetch(`${API_BASE_URL}/chat/stream`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+            message: message,
+            user_id: currentUserId || 'anonymous'
+        })
+    });
+
+    if (!response.ok) {
+        // 503 while the assistant is busy
         const data = await response.json();
-        return data.response;
+        return data.detail || "I'm sorry, I'm having trouble connecting to the server right now.";
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let answer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+        for (const line of lines) {
+            if (!line.trim()) continue;
+            const event = JSON.parse(line);
+            if (event.type === 'token') {
+                answer += event.token;
+                if (onToken) onToken(event.token, answer);
+            } else if (event.type === 'done' || event.type === 'error') {
+                answer = event.response;
+            }
+        }
+    }
+    return answer;
+}
+
+async function chatWithBot(message, onToken) {
+    try {
+        return await streamChat(message, onToken);
     } catch (error) {
         console.error('Error chatting with bot:', error);
         return "I'm sorry, I'm having trouble connecting to the server right now.";
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Collision-free user ID generation across threads, workers and hosts
+IDs are time-ordered: 48-bit millisecond timestamp, 32-bit worker id, 24-bit sequence
+"""
+
+import itertools
+import os
+import random
+import time
+
+_SEQUENCE_MASK = (1 << 24) - 1
+
+
+def _new_worker_id():
+    # Low pid bits keep live workers on one host distinct; the random half
+    # separates hosts (and pid reuse) without any coordination
+    return ((os.getpid() & 0xFFFF) << 16) | random.SystemRandom().getrandbits(16)
+
+
+_worker_id = _new_worker_id()
+# next() on itertools.count is atomic under the GIL, so no lock is needed
+_sequence = itertools.count(random.SystemRandom().getrandbits(24))
+
+
+def _reset_after_fork():
+    global _worker_id, _sequence
+    _worker_id = _new_worker_id()
+    _sequence = itertools.count(random.SystemRandom().getrandbits(24))
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def new_id(prefix="user"):
+    """Return a new unique, roughly time-sortable id such as user_0192a3b4c5d6a1b2c3d4000001"""
+    millis = time.time_ns() // 1_000_000
+    sequence = next(_sequence) & _SEQUENCE_MASK
+    return f"{prefix}_{millis:012x}{_worker_id:08x}{sequence:06x}"
+
+
+def new_user_id():
+    return new_id("user")